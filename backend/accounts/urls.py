@@ -3,6 +3,7 @@ from rest_framework_simplejwt.views import TokenRefreshView
 
 from .views import (
     HealthCheckView,
+    MetricsView,
     UserRegistrationView,
     CustomTokenObtainPairView,
     UserProfileView,
@@ -15,6 +16,7 @@ app_name = 'accounts'
 urlpatterns = [
     # Health check
     path('health/', HealthCheckView.as_view(), name='health-check'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     
     # Authentication
     path('register/', UserRegistrationView.as_view(), name='register'),
@@ -4,8 +4,11 @@ from rest_framework.views import APIView
 from rest_framework.generics import RetrieveUpdateAPIView, CreateAPIView, ListAPIView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import get_user_model
+from django.http import HttpResponse
 from django.utils import timezone
 
+from core.metrics import registry
+
 from .serializers import (
     UserSerializer,
     UserRegistrationSerializer,
@@ -27,6 +30,14 @@ class HealthCheckView(APIView):
         })
 
 
+class MetricsView(APIView):
+    """Request metrics of this worker in the Prometheus text format."""
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 class UserRegistrationView(CreateAPIView):
     """API view for user registration."""
     serializer_class = UserRegistrationSerializer
@@ -1,16 +1,19 @@
 """
-ASGI config for config project.
+ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+Serving through ASGI (e.g. ``uvicorn core.asgi:application``) is required
+for the ``/api/manager/live/`` Server-Sent Events feed.
 """
 
 import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
@@ -0,0 +1,161 @@
+"""Per-route request metrics, kept in process and exported for Prometheus.
+
+``MetricsMiddleware`` times every request and, through the query recorder
+of ``core.queries``, counts its queries and the time spent in them.
+Observations are aggregated into histograms labelled by resolved URL name
+(``partie-list``, ``partie-get-stats``...) and method, and rendered in the
+Prometheus text format by ``/api/accounts/metrics/``. Each worker process
+exposes its own counters.
+
+With ``DEBUG`` on, statements run ``REPEATED_QUERY_THRESHOLD`` times or
+more within one request are logged, which is how N+1 query patterns show.
+"""
+import bisect
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .queries import QueryLog, install_on_open_connections, recording
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Cumulative Prometheus histogram with one series per label set."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            label_text = format_labels(labels)
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.series = {}
+
+    def inc(self, labels):
+        self.series[labels] = self.series.get(labels, 0) + 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(self.series.items()):
+            lines.append(f'{self.name}{{{format_labels(labels)}}} {value}')
+        return lines
+
+
+def format_labels(labels):
+    return ','.join(f'{name}="{value}"' for name, value in labels)
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = Counter('http_requests_total', 'Requests by route, method and status.')
+        self.duration = Histogram(
+            'http_request_duration_seconds', 'Wall time of the request.', DURATION_BUCKETS)
+        self.queries = Histogram(
+            'http_request_db_queries', 'Database queries run by the request.', QUERY_BUCKETS)
+        self.db_time = Histogram(
+            'http_request_db_seconds', 'Time spent in database queries.', DURATION_BUCKETS)
+        self.size = Histogram(
+            'http_response_size_bytes', 'Size of the response body.', SIZE_BUCKETS)
+
+    def record(self, route, method, status, duration, stats, size):
+        labels = (('route', route), ('method', method))
+        with self.lock:
+            self.requests.inc((*labels, ('status', str(status))))
+            self.duration.observe(labels, duration)
+            self.queries.observe(labels, stats.count)
+            self.db_time.observe(labels, stats.duration)
+            if size is not None:
+                self.size.observe(labels, size)
+
+    def render(self):
+        with self.lock:
+            metrics = (self.requests, self.duration, self.queries, self.db_time, self.size)
+            return '\n'.join(line for metric in metrics for line in metric.render()) + '\n'
+
+
+registry = Registry()
+
+
+class MetricsMiddleware:
+    """Record wall time, query count, DB time and body size of each request.
+
+    Requests slower than ``SLOW_REQUEST_MS`` are logged as warnings.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_threshold = getattr(settings, 'SLOW_REQUEST_MS', 500) / 1000
+        self.repeated_threshold = getattr(settings, 'REPEATED_QUERY_THRESHOLD', 5) if settings.DEBUG else None
+        install_on_open_connections()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with recording(QueryLog(shapes=self.repeated_threshold is not None)) as stats:
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with recording(QueryLog(shapes=self.repeated_threshold is not None)) as stats:
+            response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    def record(self, request, response, duration, stats):
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+        if response.streaming:
+            # Streamed bodies are produced after the view returns
+            size = None
+        else:
+            size = len(response.content)
+        registry.record(route, request.method, response.status_code, duration, stats, size)
+
+        if duration >= self.slow_threshold:
+            logger.warning(
+                "Slow request %s %s (%s): %.0f ms, %d queries, %.0f ms in DB",
+                request.method, request.path, route, duration * 1000, stats.count, stats.duration * 1000,
+            )
+        for shape, count in stats.repeated(self.repeated_threshold):
+            logger.warning("Repeated query in %s %s (%s), %d times: %s",
+                           request.method, request.path, route, count, shape)
@@ -0,0 +1,215 @@
+"""Query recording shared by the request metrics and the query budgets.
+
+A single execute wrapper is installed on every database connection. It
+reports each query to the recorders active in the current context, so a
+recorder set up around a request or a block of code also sees the queries
+that async views run through ``sync_to_async``.
+
+``query_budget`` is a context manager and decorator failing when a block
+runs more queries than allowed. ``QueryBudgetMixin`` applies per-action
+budgets to DRF viewsets, in the mode chosen by the ``QUERY_BUDGETS``
+setting.
+"""
+import contextvars
+import functools
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+_recorders = contextvars.ContextVar('query_recorders', default=())
+
+_IN_LIST = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+_VALUES_LIST = re.compile(r'(VALUES\s*\([^)]*\))(?:\s*,\s*\([^)]*\))+', re.IGNORECASE)
+
+
+def sql_shape(sql):
+    """Collapse the parts of a statement that vary with the batch size."""
+    sql = _IN_LIST.sub('(...)', sql)
+    return _VALUES_LIST.sub(r'\1, ...', sql)
+
+
+def record_query(execute, sql, params, many, context):
+    recorders = _recorders.get()
+    if not recorders:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        for recorder in recorders:
+            recorder.add(sql, duration)
+
+
+def install_wrapper(sender=None, connection=None, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_on_open_connections():
+    """Cover connections opened before this module was imported."""
+    for connection in connections.all(initialized_only=True):
+        install_wrapper(connection=connection)
+
+
+connection_created.connect(install_wrapper)
+
+
+@contextmanager
+def recording(recorder):
+    """Report the queries run in this context (and its threads) to ``recorder``."""
+    token = _recorders.set((*_recorders.get(), recorder))
+    try:
+        yield recorder
+    finally:
+        _recorders.reset(token)
+
+
+class QueryLog:
+    """Recorder counting queries, their time and, optionally, their shapes."""
+
+    def __init__(self, shapes=False):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter() if shapes else None
+
+    def add(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        if self.shapes is not None:
+            self.shapes[sql_shape(sql)] += 1
+
+    def repeated(self, threshold):
+        """Return the ``(shape, count)`` pairs run at least ``threshold`` times."""
+        if self.shapes is None:
+            return []
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block runs more queries than its budget."""
+
+
+class query_budget:
+    """Fail when the wrapped block or function runs more than ``max_queries``.
+
+    Usable as ``with query_budget(3):`` or ``@query_budget(3)`` on sync and
+    async functions. ``strict=False`` logs a warning instead of raising.
+    """
+
+    def __init__(self, max_queries, label=None, strict=True):
+        self.max_queries = max_queries
+        self.label = label
+        self.strict = strict
+        self.log = None
+        self._recording = None
+
+    def __enter__(self):
+        install_on_open_connections()
+        self.log = QueryLog(shapes=True)
+        self._recording = recording(self.log)
+        self._recording.__enter__()
+        return self.log
+
+    def __exit__(self, exc_type, exc, tb):
+        self._recording.__exit__(exc_type, exc, tb)
+        if exc_type is None:
+            self.check()
+
+    def check(self):
+        if self.log.count <= self.max_queries:
+            return
+        message = "{} ran {} queries, budget is {}:\n{}".format(
+            self.label or "Block", self.log.count, self.max_queries,
+            '\n'.join(f"  {count} x {shape}" for shape, count in self.log.shapes.most_common()),
+        )
+        if self.strict:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+    def __call__(self, func):
+        label = self.label or func.__qualname__
+
+        if iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with query_budget(self.max_queries, label, self.strict):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with query_budget(self.max_queries, label, self.strict):
+                    return func(*args, **kwargs)
+        return wrapper
+
+
+def budget_mode():
+    """``QUERY_BUDGETS`` setting: ``'raise'``, ``'warn'`` or ``'off'``."""
+    return getattr(settings, 'QUERY_BUDGETS', 'off')
+
+
+def budget_for(query_budgets, action, view=None):
+    """Look up the budget of ``action``; callables are given the view."""
+    max_queries = query_budgets.get(action, query_budgets.get('default'))
+    if callable(max_queries):
+        max_queries = max_queries(view)
+    return max_queries
+
+
+class QueryBudgetMixin:
+    """Enforce ``query_budgets[action]`` on each viewset action.
+
+    Budgets are checked when ``QUERY_BUDGETS`` is ``'warn'`` (logged) or
+    ``'raise'`` (the request fails, as tests should). Actions missing from
+    ``query_budgets`` get the ``'default'`` entry. A budget may be a
+    callable taking the view, for actions whose cost grows with the size of
+    the request, or ``None`` to leave the action unchecked.
+    """
+    query_budgets = {}
+
+    def initial(self, request, *args, **kwargs):
+        mode = budget_mode()
+        if mode != 'off':
+            max_queries = budget_for(self.query_budgets, self.action, self)
+            if max_queries is not None:
+                label = f"{type(self).__name__}.{self.action}"
+                self._query_budget = query_budget(max_queries, label, strict=mode == 'raise')
+                self._query_budget.__enter__()
+        super().initial(request, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        self._query_budget = None
+        failed = True
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+            failed = False
+        finally:
+            # Always leave the recording, or the thread keeps the recorder
+            if self._query_budget is not None:
+                self._query_budget.__exit__(Exception if failed else None, None, None)
+        return response
+
+
+def action_budget(viewset_class, action):
+    """Apply a viewset's budget for ``action`` to an async view serving it outside DRF."""
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            mode = budget_mode()
+            max_queries = budget_for(viewset_class.query_budgets, action)
+            if mode == 'off' or max_queries is None:
+                return await view(request, *args, **kwargs)
+            label = f"{viewset_class.__name__}.{action}"
+            with query_budget(max_queries, label, strict=mode == 'raise'):
+                return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Third-party apps
     'rest_framework',
     'rest_framework_simplejwt',
@@ -37,6 +38,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -67,16 +69,50 @@ TEMPLATES = [
 WSGI_APPLICATION = 'core.wsgi.application'
 
 # Database configuration
+# Set when connecting through PgBouncer in transaction pooling mode
+DB_POOLER = os.environ.get('DB_POOLER', 'False').lower() == 'true'
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'Billarde',
-        'USER': 'postgres',
-        'PASSWORD': '12345',
-        'HOST': 'localhost',
-        'PORT': '5433',
+        'ENGINE': os.environ.get('DB_ENGINE', 'django.db.backends.postgresql'),
+        'NAME': os.environ.get('DB_NAME', 'Billarde'),
+        'USER': os.environ.get('DB_USER', 'postgres'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', '12345'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5433'),
+        # Seconds a connection is kept open between requests (0 = per request)
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'False').lower() == 'true',
+        # Required behind a transaction-pooling PgBouncer
+        'DISABLE_SERVER_SIDE_CURSORS': DB_POOLER,
     }
 }
+# The live feed holds a LISTEN connection, which a transaction pooler cannot
+# carry: behind PgBouncer, point it at PostgreSQL itself.
+DB_LISTEN_HOST = os.environ.get('DB_LISTEN_HOST')
+DB_LISTEN_PORT = os.environ.get('DB_LISTEN_PORT')
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['OPTIONS'] = {
+        'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+    }
+
+# Cache configuration
+# Local memory by default; set REDIS_URL to share the cache between workers
+# (required as soon as more than one process serves requests, and enforced
+# by core.settings_production).
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -158,6 +194,15 @@ CORS_ALLOWED_ORIGINS = [h.strip() for h in os.environ.get('CORS_ALLOWED_ORIGINS'
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_ALL_ORIGINS = DEBUG  # Only allow all in development
 
+# Requests slower than this (milliseconds) are logged by core.metrics
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 500))
+
+# Per-action query budgets of the API viewsets (core.queries):
+# 'raise' fails the request, 'warn' logs it, 'off' skips the check
+QUERY_BUDGETS = os.environ.get('QUERY_BUDGETS', 'warn' if DEBUG else 'off')
+# With DEBUG, log SQL statements repeated this many times in one request
+REPEATED_QUERY_THRESHOLD = int(os.environ.get('REPEATED_QUERY_THRESHOLD', 5))
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -189,5 +234,15 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': False,
         },
+        'core.metrics': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'core.queries': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
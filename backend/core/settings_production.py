@@ -0,0 +1,37 @@
+"""
+Production settings for core project.
+
+Select with DJANGO_SETTINGS_MODULE=core.settings_production. Everything is
+inherited from core.settings; this profile turns off debugging, keeps
+database connections open between requests and requires a shared cache.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, REDIS_URL
+
+DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
+CORS_ALLOW_ALL_ORIGINS = DEBUG
+
+# Persistent connections: reuse the TCP + auth handshake across requests and
+# check a reused connection is still alive before handing it to a request.
+# Behind PgBouncer (DB_POOLER=True) the pooler keeps the server connections
+# instead, and DB_CONN_MAX_AGE=0 is the recommended setting.
+DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+DATABASES['default']['CONN_HEALTH_CHECKS'] = os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true'
+
+# The change versions behind the ETags, the cached Parametres and the stats
+# cache must be seen by every worker: a per-process cache would leave the
+# other workers serving stale lists and old tariffs.
+if not REDIS_URL:
+    raise ImproperlyConfigured(
+        "REDIS_URL must point to a cache shared by all workers in production."
+    )
+
+# Security
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+SESSION_COOKIE_SECURE = os.environ.get('SECURE_COOKIES', 'True').lower() == 'true'
+CSRF_COOKIE_SECURE = SESSION_COOKIE_SECURE
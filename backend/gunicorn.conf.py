@@ -0,0 +1,16 @@
+"""Gunicorn profile serving the project through ASGI with uvicorn workers.
+
+Each worker runs an event loop, so slow dashboard clients and open live
+feeds do not tie up a process. Tune with WEB_CONCURRENCY and PORT.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = 'uvicorn.workers.UvicornWorker'
+# Live feed connections stay open; only kill workers that stop heartbeating.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+accesslog = '-'
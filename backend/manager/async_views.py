@@ -0,0 +1,108 @@
+"""Async handlers for the read-heavy manager endpoints.
+
+Under ASGI these serve ``GET`` on the tables list, the parties list,
+``get_stats`` and ``search_client`` without occupying a worker thread while
+waiting on the database. Any other method on the same URLs is handed to the
+regular DRF viewset, so writes keep their existing behaviour.
+"""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.exceptions import custom_exception_handler
+from core.queries import action_budget
+
+from . import versioning
+from .autocomplete import client_autocomplete
+from .serializers import PartieListSerializer, TableSerializer
+from .stats import aget_dashboard_stats
+from .views import PartieViewSet, TableViewSet
+
+
+def json_response(data, status=200):
+    """Render ``data`` like DRF's JSONRenderer does."""
+    return JsonResponse(
+        data, status=status, safe=False, encoder=JSONEncoder,
+        json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False},
+    )
+
+
+def async_read(async_get, sync_view):
+    """Serve GET/HEAD with ``async_get`` and every other method with ``sync_view``."""
+    sync_handler = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await sync_handler(request, *args, **kwargs)
+        try:
+            return await async_get(request, *args, **kwargs)
+        except APIException as exc:
+            response = custom_exception_handler(exc, {})
+            return json_response(response.data, status=response.status_code)
+
+    # CSRF is enforced by DRF's authentication, as for the sync views.
+    view.csrf_exempt = True
+    return view
+
+
+async def conditional(request, etag_func, build):
+    """Answer 304 when ``If-None-Match`` matches, else build the response."""
+    etag = quote_etag(await sync_to_async(etag_func)(request))
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = await build()
+    # Like ``condition``, the 304 carries the tag too
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def viewset_for(viewset_class, request, action):
+    """Instantiate a viewset to reuse its query building outside dispatch."""
+    return viewset_class(request=Request(request), action=action, format_kwarg=None, args=(), kwargs={})
+
+
+tables_etag = versioning.collection_etag(versioning.TABLES)
+parties_etag = versioning.collection_etag(
+    versioning.PARTIES, versioning.CLIENTS, versioning.TABLES, per_minute=True,
+)
+
+
+@action_budget(TableViewSet, 'list')
+async def tables_list(request):
+    async def build():
+        view = viewset_for(TableViewSet, request, 'list')
+        tables = [table async for table in view.get_queryset()]
+        return json_response(TableSerializer(tables, many=True).data)
+
+    return await conditional(request, tables_etag, build)
+
+
+@action_budget(PartieViewSet, 'list')
+async def parties_list(request):
+    async def build():
+        view = viewset_for(PartieViewSet, request, 'list')
+        queryset = view.get_queryset()
+        paginator = view.paginator
+        # DRF's cursor paginator evaluates the queryset itself; run it the
+        # way the async ORM runs queries.
+        page = await sync_to_async(paginator.paginate_queryset)(queryset, view.request, view=view)
+        data = PartieListSerializer(page, many=True).data
+        return json_response(paginator.get_paginated_response(data).data)
+
+    return await conditional(request, parties_etag, build)
+
+
+@action_budget(PartieViewSet, 'get_stats')
+async def get_stats(request):
+    return json_response(await aget_dashboard_stats())
+
+
+@action_budget(PartieViewSet, 'search_client')
+async def search_client(request):
+    q = request.GET.get('q', '')
+    return json_response(await client_autocomplete.asearch(q, limit=10))
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+
+from .models import Client
+from .utils import normalize_name
+
+
+class ClientAutocomplete:
+    """Ranked client-name autocomplete backed by a bounded LRU of query prefixes.
+
+    Prefix lookups hit the ``nom_normalise`` btree index, and later-word
+    matches its trigram index. Results are kept per
+    normalized query for ``ttl`` seconds; entries that could contain a client
+    are evicted as soon as that client is created, renamed or deleted in this
+    process, and the TTL bounds staleness across worker processes.
+
+    Only the fields names are matched on are read and cached. Balances
+    change through queryset updates that never evict entries, so they are
+    left to the clients endpoints.
+    """
+    FIELDS = ('id', 'nom', 'nom_normalise')
+
+    def __init__(self, max_entries=512, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def search(self, query, limit=10):
+        """Return up to ``limit`` clients matching ``query``, as ``{id, nom}``.
+
+        Names starting with the query come first (exact match on top), then
+        names with a later word starting with it; shorter names rank higher.
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+
+        cached = self._get(key)
+        if cached is None:
+            cached = self._lookup(key, limit)
+            self._put(key, cached)
+        return cached[:limit]
+
+    async def asearch(self, query, limit=10):
+        """Async version of ``search`` using the async ORM."""
+        key = normalize_name(query)
+        if not key:
+            return []
+
+        cached = self._get(key)
+        if cached is None:
+            cached = await self._alookup(key, limit)
+            self._put(key, cached)
+        return cached[:limit]
+
+    @staticmethod
+    def _prefix_matches(key):
+        return Client.objects.filter(nom_normalise__startswith=key).order_by('nom_normalise')
+
+    @staticmethod
+    def _word_matches(key):
+        return Client.objects.filter(nom_normalise__contains=f' {key}').order_by('nom_normalise')
+
+    def _lookup(self, key, limit):
+        matches = list(self._prefix_matches(key).values_list(*self.FIELDS)[:limit])
+        if len(matches) < limit:
+            matches += self._word_matches(key).values_list(*self.FIELDS)[:limit - len(matches)]
+        return self._rank(key, matches)
+
+    async def _alookup(self, key, limit):
+        matches = [row async for row in self._prefix_matches(key).values_list(*self.FIELDS)[:limit]]
+        if len(matches) < limit:
+            matches += [
+                row async for row in self._word_matches(key).values_list(*self.FIELDS)[:limit - len(matches)]
+            ]
+        return self._rank(key, matches)
+
+    @staticmethod
+    def _rank(key, matches):
+        def rank(row):
+            name = row[2]
+            if name == key:
+                tier = 0
+            elif name.startswith(key):
+                tier = 1
+            else:
+                tier = 2
+            return tier, len(name), name
+
+        matches.sort(key=rank)
+        return [{'id': pk, 'nom': nom} for pk, nom, _ in matches]
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    def _put(self, key, data):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *names):
+        """Evict every cached query whose results could include one of ``names``."""
+        names = [f' {name}' for name in names if name]
+        with self._lock:
+            stale = [key for key in self._entries if any(f' {key}' in name for name in names)]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+client_autocomplete = ClientAutocomplete()
@@ -0,0 +1,141 @@
+"""Timings of the main API endpoints, comparable between commits.
+
+Each scenario sends real requests through the Django test client, so the
+whole stack (middleware, async handlers, serializers, queries) is measured.
+Everything runs inside a transaction that is rolled back at the end, so
+the start/stop/pay cycle leaves the database as it found it. The cache is
+swapped for a private local-memory one for the same reason: stats and
+settings computed from rolled-back rows must not reach the shared cache.
+Run it on a database filled by ``seed_hall`` for meaningful numbers.
+"""
+import platform
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from core.queries import QueryLog, install_on_open_connections, recording
+
+from .models import Client, Parametres, Partie, Table
+from .stats import stats_cache_key
+
+
+# Keeps what the benchmark caches away from the cache the application uses
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=settings.BASE_DIR, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(timings, queries):
+    timings = sorted(timings)
+    return {
+        'runs': len(timings),
+        'mean_ms': round(statistics.fmean(timings), 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        'min_ms': round(timings[0], 2),
+        'max_ms': round(timings[-1], 2),
+        'queries': max(queries),
+    }
+
+
+class Benchmark:
+    """Time each scenario ``iterations`` times after ``warmup`` untimed runs."""
+
+    def __init__(self, iterations=50, warmup=5):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.client = APIClient()
+        self.samples = {}
+
+    def request(self, name, method, path, data=None, expected=200):
+        with recording(QueryLog()) as log:
+            start = time.perf_counter()
+            response = getattr(self.client, method)(path, data, format='json')
+            elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code != expected:
+            raise RuntimeError(f"{name}: {method.upper()} {path} answered {response.status_code}")
+        timings, queries = self.samples.setdefault(name, ([], []))
+        timings.append(elapsed)
+        queries.append(log.count)
+        return response
+
+    def scenarios(self, table_id, prefixes, run):
+        self.request('parties_list', 'get', '/api/manager/parties/')
+        self.request('parties_list_all', 'get', '/api/manager/parties/?scope=all')
+        # Versions are bumped on commit, which never comes here: drop the
+        # cached stats to also time their computation
+        cache.delete(stats_cache_key())
+        self.request('get_stats_cold', 'get', '/api/manager/parties/get_stats/')
+        self.request('get_stats', 'get', '/api/manager/parties/get_stats/')
+        self.request('search_client', 'get', f'/api/manager/parties/search_client/?q={prefixes[run % len(prefixes)]}')
+        partie = self.request('start', 'post', '/api/manager/parties/', {'table': table_id}, expected=201).json()
+        self.request('stop', 'post', f"/api/manager/parties/{partie['id']}/stop/",
+                     {'loser_name': f'Benchmark {run}', 'auto_start': 'false'})
+        self.request('pay', 'post', f"/api/manager/parties/{partie['id']}/pay/")
+
+    def run(self):
+        install_on_open_connections()
+        counts = {
+            'tables': Table.objects.count(),
+            'clients': Client.objects.count(),
+            'parties': Partie.objects.count(),
+        }
+        prefixes = [nom[:2] for nom in Client.objects.order_by('id').values_list('nom', flat=True)[:20]] or ['a']
+
+        with override_settings(ALLOWED_HOSTS=['testserver'], CACHES=BENCHMARK_CACHES):
+            try:
+                with transaction.atomic():
+                    # A dedicated table, so start never finds the table busy
+                    numero = (Table.objects.order_by('-numero').values_list('numero', flat=True).first() or 0) + 1
+                    table = Table.objects.create(numero=numero, nom="Benchmark", prix_heure=0)
+                    for run in range(self.warmup + self.iterations):
+                        if run == self.warmup:
+                            self.samples = {}
+                        self.scenarios(table.id, prefixes, run)
+                    raise Rollback
+            except Rollback:
+                pass
+        # Also forget the configuration this process loaded during the run
+        Parametres._cached = None
+
+        return {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'iterations': self.iterations,
+            'data': counts,
+            'results': {name: summarize(*sample) for name, sample in self.samples.items()},
+        }
+
+
+def compare(current, baseline, field='median_ms'):
+    """Yield ``(name, baseline, current, change)`` on ``field`` of each result."""
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if before:
+            change = (result[field] - before[field]) / before[field] if before[field] else 0
+            yield name, before[field], result[field], change
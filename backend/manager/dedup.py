@@ -0,0 +1,70 @@
+"""Merge clients whose names only differ by case, spacing or accents.
+
+The functions take the model classes as arguments so the same code runs in
+the ``merge_clients`` command and in the migration that makes
+``nom_normalise`` unique, where only historical models are available.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+
+from .utils import normalize_name
+
+CHUNK_SIZE = 500
+# Contact fields copied from a duplicate when the kept client has none
+CONTACT_FIELDS = ('telephone', 'email')
+
+
+def duplicate_groups(client_model):
+    """Return ``[(kept_id, [duplicate ids])]``, keeping the oldest client of each name.
+
+    Names are grouped on their recomputed normalized form, so rows written
+    before ``nom_normalise`` existed (or with a stale value) are caught too.
+    """
+    groups = defaultdict(list)
+    for pk, nom in client_model.objects.order_by('id').values_list('id', 'nom').iterator(chunk_size=2000):
+        groups[normalize_name(nom)[:100]].append(pk)
+    return [(ids[0], ids[1:]) for ids in groups.values() if len(ids) > 1]
+
+
+def merge_clients(client_model, groups, chunk_size=CHUNK_SIZE):
+    """Repoint every reference to the duplicates onto the kept clients, then delete them.
+
+    Each chunk of groups is merged in one transaction with a single
+    ``UPDATE ... CASE`` per referencing foreign key. Returns the number of
+    rows repointed.
+    """
+    relations = [rel for rel in client_model._meta.related_objects if not rel.many_to_many]
+    repointed = 0
+    for start in range(0, len(groups), chunk_size):
+        chunk = groups[start:start + chunk_size]
+        kept_by_duplicate = {dup: kept for kept, duplicates in chunk for dup in duplicates}
+        with transaction.atomic():
+            for rel in relations:
+                field = rel.field
+                repointed += rel.related_model.objects.filter(**{f'{field.name}__in': kept_by_duplicate}).update(**{
+                    field.attname: Case(*[
+                        When(**{field.attname: dup}, then=Value(kept)) for dup, kept in kept_by_duplicate.items()
+                    ]),
+                })
+            copy_contacts(client_model, chunk)
+            client_model.objects.filter(pk__in=kept_by_duplicate).delete()
+    return repointed
+
+
+def copy_contacts(client_model, chunk):
+    """Fill the kept clients' blank contact fields from their duplicates."""
+    ids = [pk for kept, duplicates in chunk for pk in (kept, *duplicates)]
+    contacts = {row['id']: row for row in client_model.objects.filter(pk__in=ids).values('id', *CONTACT_FIELDS)}
+    updated = []
+    for kept, duplicates in chunk:
+        values = dict(contacts[kept])
+        for field in CONTACT_FIELDS:
+            values[field] = values[field] or next(
+                (contacts[dup][field] for dup in duplicates if contacts[dup][field]), values[field],
+            )
+        if values != contacts[kept]:
+            updated.append(client_model(**values))
+    if updated:
+        client_model.objects.bulk_update(updated, CONTACT_FIELDS)
@@ -0,0 +1,157 @@
+"""Live feed of game and table state changes.
+
+Events are published after the surrounding transaction commits. On
+PostgreSQL they travel through ``NOTIFY`` so every worker process relays
+them to its own Server-Sent Events subscribers; on other databases they are
+only delivered inside the publishing process. ``LISTEN`` needs a session of
+its own, so behind a transaction-pooling PgBouncer the listener connects to
+PostgreSQL directly (``DB_LISTEN_HOST``/``DB_LISTEN_PORT``).
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'billard_events'
+
+PARTIE_STARTED = 'partie.started'
+PARTIE_STOPPED = 'partie.stopped'
+PARTIE_PAID = 'partie.paid'
+TABLE_UPDATED = 'table.updated'
+QUEUE_UPDATED = 'table.queue'
+
+# NOTIFY rejects payloads of 8000 bytes or more
+NOTIFY_MAX_BYTES = 7999
+
+
+class EventBroker:
+    """Fan events out to the asyncio queues of the connected clients."""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def subscribe(self):
+        """Register a queue for the running event loop and return it."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+            if self._listener is None and connection.vendor == 'postgresql':
+                self._listener = PostgresListener(self)
+                self._listener.start()
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers = {sub for sub in self._subscribers if sub[1] is not queue}
+
+    def dispatch(self, payload):
+        """Deliver a serialized event to every subscriber of this process."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_offer, queue, payload)
+
+
+def _offer(queue, payload):
+    # A client too slow to drain its queue misses events rather than
+    # holding memory; it resynchronises from the REST endpoints.
+    try:
+        queue.put_nowait(payload)
+    except asyncio.QueueFull:
+        pass
+
+
+class PostgresListener(threading.Thread):
+    """Relay ``NOTIFY`` payloads from PostgreSQL to the local broker."""
+    daemon = True
+
+    def __init__(self, broker, timeout=5):
+        super().__init__(name='billard-events-listener')
+        self.broker = broker
+        self.timeout = timeout
+
+    def connection_params(self):
+        """Connection parameters of the default database, on the direct address if set."""
+        params = connections['default'].get_connection_params()
+        if settings.DB_LISTEN_HOST:
+            params['host'] = settings.DB_LISTEN_HOST
+            if settings.DB_LISTEN_PORT:
+                params['port'] = settings.DB_LISTEN_PORT
+        return params
+
+    def run(self):
+        if settings.DB_POOLER and not settings.DB_LISTEN_HOST:
+            # Through the pooler LISTEN is accepted but nothing is ever delivered
+            logger.error("Live feed disabled: DB_POOLER is set without DB_LISTEN_HOST to reach PostgreSQL directly")
+            return
+        db = connections['default']
+        while True:
+            try:
+                conn = db.get_new_connection(self.connection_params())
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+                while True:
+                    if select.select([conn], [], [], self.timeout) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.broker.dispatch(conn.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Live feed listener lost its connection, reconnecting")
+                time.sleep(1)
+
+
+broker = EventBroker()
+
+
+def publish(event_type, data):
+    """Publish an event once the current transaction commits.
+
+    Delivery is best effort: the write has committed by then, so a failure
+    is logged rather than turned into an error response, and clients
+    resynchronise from the REST endpoints.
+    """
+    payload = json.dumps({'type': event_type, 'data': data}, cls=JSONEncoder)
+    size = len(payload.encode())
+    if size > NOTIFY_MAX_BYTES:
+        logger.warning("Live feed event %s dropped: its %d bytes payload does not fit in a NOTIFY", event_type, size)
+        return
+
+    def send():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+        else:
+            broker.dispatch(payload)
+
+    transaction.on_commit(send, robust=True)
+
+
+def publish_partie(event_type, partie):
+    from .serializers import PartieSerializer
+
+    publish(event_type, PartieSerializer(partie).data)
+
+
+def publish_table(table):
+    from .serializers import TableSerializer
+
+    publish(TABLE_UPDATED, TableSerializer(table).data)
+
+
+def publish_queue(table_id, queue):
+    # Only the size: a long queue would not fit in a NOTIFY payload, and
+    # clients read the entries from tables/{id}/queue/
+    publish(QUEUE_UPDATED, {'table': table_id, 'size': len(queue)})
@@ -0,0 +1,293 @@
+"""Bulk import of clients and finished game sessions from CSV.
+
+The file is parsed row by row and written with ``bulk_create`` in batches,
+each batch in its own transaction, so an import of several hundred thousand
+lines keeps a bounded memory footprint and commits progressively. Client
+names are resolved on ``nom_normalise`` through an in-memory map, so a name
+spelled differently across rows ("Éric", "ERIC ") maps to one client.
+
+The parties format is the one produced by ``parties/export/``: ``id``,
+``table`` (numéro), ``client``, ``date_debut``, ``date_fin``, ``prix`` and
+``paye``; other columns are ignored. A missing ``prix`` is computed with the
+current tariffs. A row whose ``id`` is already a game (live or archived)
+with the same start is skipped, so re-importing an export is a no-op.
+"""
+import csv
+import time
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import versioning
+from .autocomplete import client_autocomplete
+from .models import Client, Parametres, Partie, PartieArchive, RevenueRollup, Table, tarifer
+from .utils import normalize_name
+
+BATCH_SIZE = 1000
+# Row errors kept in the report; the rest are only counted
+MAX_ERRORS = 50
+
+TRUE_VALUES = {'1', 'true', 'vrai', 'oui', 'yes', 'o', 'y'}
+
+
+class CSVImportError(Exception):
+    """A CSV file or row that cannot be imported."""
+
+
+class ImportReport:
+    """Counters of an import run, reported as progress and as the result."""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.clients_created = 0
+        self.existing = 0
+        self.skipped = 0
+        self.errors = []
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0
+
+    def error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({'ligne': line, 'erreur': message})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'clients_created': self.clients_created,
+            'existing': self.existing,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+        }
+
+
+class ClientResolver:
+    """Map client names to ids, creating the missing clients in bulk.
+
+    Known names are cached for the whole import, so each distinct name costs
+    at most one lookup and one insert, shared with every other name of the
+    same batch.
+    """
+
+    def __init__(self, report):
+        self.report = report
+        self.ids = {}
+
+    def resolve(self, names):
+        """Make sure every name of ``names`` has an id in ``self.ids``."""
+        wanted = {}
+        for nom in names:
+            key = normalize_name(nom)[:100]
+            if key and key not in self.ids:
+                wanted.setdefault(key, nom.strip()[:100])
+        if not wanted:
+            return
+
+        for pk, key in Client.objects.filter(nom_normalise__in=wanted).values_list('id', 'nom_normalise'):
+            self.ids.setdefault(key, pk)
+        missing = [
+            Client(nom=nom, nom_normalise=key)
+            for key, nom in wanted.items() if key not in self.ids
+        ]
+        if missing:
+            # bulk_create skips Client.save(), hence nom_normalise set above
+            for client in Client.objects.bulk_create(missing):
+                self.ids[client.nom_normalise] = client.pk
+            self.report.clients_created += len(missing)
+
+    def get(self, nom):
+        return self.ids.get(normalize_name(nom)[:100])
+
+
+def read_csv(stream):
+    """Iterate over ``(line, row)`` of a CSV text stream, header excluded."""
+    reader = csv.DictReader(stream)
+    if not reader.fieldnames:
+        raise CSVImportError("Fichier CSV vide.")
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    for row in reader:
+        yield reader.line_num, {key: (value or '').strip() for key, value in row.items() if key}
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_datetime_value(value, column):
+    dt = parse_datetime(value) if value else None
+    if dt is None:
+        raise CSVImportError(f"{column} invalide ou manquant.")
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+def parse_float(value, column):
+    try:
+        return float(value.replace(',', '.'))
+    except ValueError:
+        raise CSVImportError(f"{column} invalide.")
+
+
+def known_names(keys):
+    return set(Client.objects.filter(nom_normalise__in=keys).values_list('nom_normalise', flat=True))
+
+
+def create_clients(clients, report):
+    """Insert ``{key: (line, client)}`` and return how many were created.
+
+    A name inserted concurrently, after the known names were read, fails
+    the bulk insert; the batch is then retried row by row and the names
+    already taken are reported.
+    """
+    try:
+        with transaction.atomic():
+            Client.objects.bulk_create([client for line, client in clients.values()])
+        return len(clients)
+    except IntegrityError:
+        pass
+    created = 0
+    for line, client in clients.values():
+        try:
+            with transaction.atomic():
+                client.save(force_insert=True)
+            created += 1
+        except IntegrityError:
+            report.error(line, f"client {client.nom!r} déjà créé entre-temps.")
+    return created
+
+
+def import_clients(stream, batch_size=BATCH_SIZE, progress=None):
+    """Import clients (``nom``, ``telephone``, ``email``), skipping known names."""
+    report = ImportReport()
+    seen = set()
+    for batch in batched(read_csv(stream), batch_size):
+        clients = {}
+        for line, row in batch:
+            report.rows += 1
+            key = normalize_name(row.get('nom'))[:100]
+            if not key:
+                report.error(line, "nom manquant.")
+                continue
+            if key in seen:
+                continue
+            seen.add(key)
+            clients[key] = line, Client(
+                nom=row['nom'][:100], nom_normalise=key,
+                telephone=row.get('telephone', '')[:20], email=row.get('email') or None,
+            )
+
+        with transaction.atomic():
+            known = known_names(clients)
+            report.created += create_clients(
+                {key: entry for key, entry in clients.items() if key not in known}, report,
+            )
+        if progress:
+            progress(report)
+
+    if report.created:
+        client_autocomplete.clear()
+        versioning.bump(versioning.CLIENTS)
+    return report
+
+
+def import_parties(stream, batch_size=BATCH_SIZE, progress=None):
+    """Import finished game sessions, creating their clients on the way."""
+    report = ImportReport()
+    tables = dict(Table.objects.values_list('numero', 'id'))
+    config = Parametres.get_cached()
+    clients = ClientResolver(report)
+
+    for batch in batched(read_csv(stream), batch_size):
+        rows = []
+        for line, row in batch:
+            report.rows += 1
+            try:
+                rows.append(parse_partie_row(row, tables, config))
+            except CSVImportError as exc:
+                report.error(line, str(exc))
+
+        with transaction.atomic():
+            imported = already_imported(source_id for partie, nom, source_id in rows if source_id)
+            new_rows = [
+                (partie, nom) for partie, nom, source_id in rows
+                if (source_id, partie.date_debut) not in imported
+            ]
+            report.existing += len(rows) - len(new_rows)
+            clients.resolve(nom for partie, nom in new_rows if nom)
+            parties = []
+            for partie, nom in new_rows:
+                if nom:
+                    partie.client_id = clients.get(nom)
+                parties.append(partie)
+            Partie.objects.bulk_create(parties)
+            RevenueRollup.record_many((partie, partie.rollup_contribution()) for partie in parties)
+            Client.ajuster_soldes(partie.dette() for partie in parties)
+        report.created += len(parties)
+        if progress:
+            progress(report)
+
+    if report.clients_created:
+        client_autocomplete.clear()
+    versioning.bump(versioning.CLIENTS, versioning.PARTIES)
+    return report
+
+
+def already_imported(ids):
+    """``(id, date_debut)`` of the live and archived games among ``ids``.
+
+    The start time has to match too: an export from another installation
+    reuses the same ids for unrelated games.
+    """
+    ids = list(ids)
+    if not ids:
+        return set()
+    return {
+        *Partie.objects.filter(id__in=ids).values_list('id', 'date_debut'),
+        *PartieArchive.objects.filter(id__in=ids).values_list('id', 'date_debut'),
+    }
+
+
+def parse_partie_row(row, tables, config):
+    """Build an unsaved finished ``Partie``, its client name and source id from a row."""
+    try:
+        source_id = int(row['id']) if row.get('id') else None
+    except ValueError:
+        raise CSVImportError(f"id invalide: {row['id']!r}.")
+    try:
+        table_id = tables[int(row.get('table', ''))]
+    except (KeyError, ValueError):
+        raise CSVImportError(f"Table inconnue: {row.get('table')!r}.")
+    date_debut = parse_datetime_value(row.get('date_debut'), 'date_debut')
+    date_fin = parse_datetime_value(row.get('date_fin'), 'date_fin')
+    if date_fin < date_debut:
+        raise CSVImportError("date_fin antérieure à date_debut.")
+
+    partie = Partie(
+        table_id=table_id, date_debut=date_debut, date_fin=date_fin,
+        est_en_cours=False, est_paye=row.get('paye', '').lower() in TRUE_VALUES,
+    )
+    if row.get('prix'):
+        partie.prix = parse_float(row['prix'], 'prix')
+    else:
+        partie.prix = tarifer(partie.duree_minutes, config.tarif_base, config.tarif_reduit, config.seuil_prix)
+    return partie, row.get('client', ''), source_id
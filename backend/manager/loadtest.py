@@ -0,0 +1,75 @@
+"""Requests per second a running server sustains on the main read endpoints.
+
+Unlike ``benchmark``, which times single requests through the test client
+inside one process, this sends concurrent HTTP requests to a real server,
+so per-request costs outside the views (opening a database connection,
+the worker model, a pooler) show up in the figures. Comparing two runs
+against the same data, e.g. ``DB_CONN_MAX_AGE=0`` and the production
+profile, gives the effect of a server setting.
+"""
+import statistics
+import threading
+import time
+from urllib.request import Request, urlopen
+
+from .benchmark import git_commit
+
+DEFAULT_PATHS = ('/api/manager/parties/', '/api/manager/tables/')
+
+
+class LoadTest:
+    """Hit each path from ``concurrency`` threads for ``duration`` seconds."""
+
+    def __init__(self, base_url, paths=DEFAULT_PATHS, concurrency=10, duration=10, token=None, timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.paths = paths
+        self.concurrency = concurrency
+        self.duration = duration
+        self.timeout = timeout
+        self.headers = {'Authorization': f'Bearer {token}'} if token else {}
+
+    def worker(self, url, deadline, timings, errors):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                with urlopen(Request(url, headers=self.headers), timeout=self.timeout) as response:
+                    response.read()
+            except OSError:
+                # Error statuses (HTTPError) count as failures too
+                errors.append(1)
+                continue
+            timings.append((time.perf_counter() - start) * 1000)
+
+    def hit(self, path):
+        timings, errors = [], []
+        deadline = time.perf_counter() + self.duration
+        threads = [
+            threading.Thread(target=self.worker, args=(self.base_url + path, deadline, timings, errors))
+            for _ in range(self.concurrency)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        timings.sort()
+        return {
+            'requests': len(timings),
+            'errors': len(errors),
+            'rps': round(len(timings) / elapsed, 1),
+            'median_ms': round(statistics.median(timings), 2) if timings else None,
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2) if timings else None,
+        }
+
+    def run(self, label=None):
+        return {
+            'commit': git_commit(),
+            'label': label,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'url': self.base_url,
+            'concurrency': self.concurrency,
+            'duration': self.duration,
+            'results': {path: self.hit(path) for path in self.paths},
+        }
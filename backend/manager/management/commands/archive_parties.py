@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from django.utils import timezone
+
+from manager.models import PartieArchive
+
+
+class Command(BaseCommand):
+    help = "Move paid game sessions older than a given age to the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=90, metavar='DAYS',
+            help="Archive paid games finished more than this many days ago.",
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help="Games moved per transaction.")
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 1:
+            raise CommandError("--older-than doit être d'au moins 1 jour.")
+        avant = timezone.now() - timedelta(days=options['older_than'])
+
+        def progress(total):
+            self.stdout.write(f"  {total} parties archivées")
+
+        try:
+            total = PartieArchive.archiver(
+                avant,
+                batch_size=options['batch_size'],
+                progress=progress if options['verbosity'] > 1 else None,
+            )
+        except IntegrityError as exc:
+            raise CommandError(f"Partie déjà présente dans les archives, lot annulé : {exc}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} parties terminées avant le {timezone.localtime(avant):%Y-%m-%d} archivées."
+        ))
@@ -0,0 +1,39 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from manager.benchmark import Benchmark, compare
+
+
+class Command(BaseCommand):
+    help = "Time the main API endpoints and write the results as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help="Timed runs of each scenario.")
+        parser.add_argument('--warmup', type=int, default=5, help="Untimed runs before measuring.")
+        parser.add_argument('--output', help="Write the JSON results to this file instead of stdout.")
+        parser.add_argument('--compare', metavar='BASELINE', help="Results file to compare the medians with.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+
+        results = Benchmark(iterations=options['iterations'], warmup=options['warmup']).run()
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+        else:
+            self.stdout.write(output)
+
+        if baseline:
+            self.stdout.write(f"\nMedian vs {baseline.get('commit') or options['compare']}:")
+            for name, before, after, change in compare(results, baseline):
+                style = self.style.ERROR if change > 0.1 else self.style.SUCCESS if change < -0.1 else str
+                self.stdout.write(style(f"  {name:<18} {before:>9.2f} ms -> {after:>9.2f} ms ({change:+.0%})"))
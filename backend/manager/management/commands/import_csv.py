@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from manager.importer import BATCH_SIZE, CSVImportError, import_clients, import_parties
+
+IMPORTERS = {
+    'clients': import_clients,
+    'parties': import_parties,
+}
+
+
+class Command(BaseCommand):
+    help = "Import clients or finished game sessions from a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS), help="What the file contains.")
+        parser.add_argument('path', help="CSV file, UTF-8 with a header row.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Rows inserted per transaction.")
+
+    def handle(self, *args, **options):
+        def progress(report):
+            self.stdout.write(
+                f"  {report.rows} lignes lues, {report.created} créées "
+                f"({report.rows_per_second:.0f} lignes/s)"
+            )
+
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as stream:
+                report = IMPORTERS[options['kind']](
+                    stream,
+                    batch_size=options['batch_size'],
+                    progress=progress if options['verbosity'] > 1 else None,
+                )
+        except (OSError, CSVImportError) as exc:
+            raise CommandError(exc)
+
+        for error in report.errors:
+            self.stdout.write(self.style.WARNING(f"  Ligne {error['ligne']}: {error['erreur']}"))
+        summary = report.as_dict()
+        created = f"{summary['created']}/{summary['rows']} lignes importées"
+        if summary['clients_created']:
+            created += f", {summary['clients_created']} clients créés"
+        if summary['existing']:
+            created += f", {summary['existing']} déjà présentes"
+        self.stdout.write(self.style.SUCCESS(
+            f"{created}, {summary['skipped']} lignes rejetées, "
+            f"{summary['seconds']}s ({summary['rows_per_second']} lignes/s)."
+        ))
@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from manager.benchmark import compare
+from manager.loadtest import DEFAULT_PATHS, LoadTest
+
+
+class Command(BaseCommand):
+    help = "Measure the requests per second a running server sustains and write the results as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000', help="Base URL of the server under test.")
+        parser.add_argument('--path', action='append', dest='paths',
+                            help="Endpoint to load, repeatable (default: the parties and tables lists).")
+        parser.add_argument('--concurrency', type=int, default=10, help="Concurrent clients per endpoint.")
+        parser.add_argument('--duration', type=float, default=10, help="Seconds spent on each endpoint.")
+        parser.add_argument('--token', help="JWT access token sent as a Bearer header.")
+        parser.add_argument('--label', help="Free text stored with the results, e.g. the server settings.")
+        parser.add_argument('--output', help="Write the JSON results to this file instead of stdout.")
+        parser.add_argument('--compare', metavar='BASELINE', help="Results file to compare the req/s with.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+
+        load_test = LoadTest(
+            options['url'], paths=options['paths'] or DEFAULT_PATHS, concurrency=options['concurrency'],
+            duration=options['duration'], token=options['token'],
+        )
+        results = load_test.run(label=options['label'])
+        if not any(result['requests'] for result in results['results'].values()):
+            raise CommandError(f"No request to {options['url']} succeeded; is the server running?")
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+        else:
+            self.stdout.write(output)
+
+        if baseline:
+            name = baseline.get('label') or baseline.get('commit') or options['compare']
+            self.stdout.write(f"\nRequests/s vs {name}:")
+            for path, before, after, change in compare(results, baseline, field='rps'):
+                style = self.style.ERROR if change < -0.1 else self.style.SUCCESS if change > 0.1 else str
+                self.stdout.write(style(f"  {path:<24} {before:>8.1f} -> {after:>8.1f} ({change:+.0%})"))
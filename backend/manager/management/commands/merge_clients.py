@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from manager import versioning
+from manager.autocomplete import client_autocomplete
+from manager.dedup import CHUNK_SIZE, duplicate_groups, merge_clients
+from manager.models import Client
+
+
+class Command(BaseCommand):
+    help = "Merge clients whose names only differ by case, spacing or accents."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Names merged per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="List the duplicates without merging them.")
+
+    def handle(self, *args, **options):
+        groups = duplicate_groups(Client)
+        duplicates = sum(len(ids) for kept, ids in groups)
+        if options['verbosity'] > 1 or options['dry_run']:
+            noms = dict(Client.objects.filter(pk__in=[kept for kept, ids in groups]).values_list('id', 'nom'))
+            for kept, ids in groups:
+                self.stdout.write(f"  {noms[kept]} (#{kept}) <- {', '.join(f'#{pk}' for pk in ids)}")
+
+        if options['dry_run'] or not groups:
+            self.stdout.write(self.style.SUCCESS(f"{duplicates} doublons trouvés pour {len(groups)} noms."))
+            return
+
+        repointed = merge_clients(Client, groups, chunk_size=options['chunk_size'])
+        Client.recalculer_soldes(Client.objects.filter(pk__in=[kept for kept, ids in groups]))
+        # Queryset updates send no signals
+        client_autocomplete.clear()
+        versioning.bump(versioning.CLIENTS, versioning.PARTIES)
+        self.stdout.write(self.style.SUCCESS(
+            f"{duplicates} doublons fusionnés pour {len(groups)} noms, {repointed} références mises à jour."
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from manager import versioning
+from manager.models import Client
+
+
+class Command(BaseCommand):
+    help = "Recompute every client's outstanding balance from the unpaid game sessions."
+
+    def handle(self, *args, **options):
+        updated = Client.recalculer_soldes()
+        versioning.bump(versioning.CLIENTS)
+        self.stdout.write(self.style.SUCCESS(f"{updated} client balances rebuilt."))
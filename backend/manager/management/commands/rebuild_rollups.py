@@ -0,0 +1,66 @@
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import ExtractHour, TruncDate
+
+from manager import versioning
+from manager.models import Partie, PartieArchive, RevenueRollup
+
+
+def buckets(queryset, paid):
+    """Aggregate finished games per (day, hour, table) rollup bucket."""
+    return (
+        queryset.order_by()
+        .annotate(day=TruncDate('date_debut'), hour=ExtractHour('date_debut'))
+        .values('day', 'hour', 'table_id')
+        .annotate(
+            revenue=Sum('prix'),
+            paid=paid,
+            games=Count('id'),
+            duration=Sum(ExpressionWrapper(F('date_fin') - F('date_debut'), output_field=DurationField())),
+        )
+    )
+
+
+class Command(BaseCommand):
+    help = "Rebuild the revenue rollups from the finished and archived game sessions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Number of rollup rows inserted per query.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        sources = [
+            buckets(Partie.objects.filter(est_en_cours=False, date_fin__isnull=False),
+                    paid=Sum('prix', filter=Q(est_paye=True))),
+            # Archived games are all paid
+            buckets(PartieArchive.objects.all(), paid=Sum('prix')),
+        ]
+        totals = defaultdict(Counter)
+        for source in sources:
+            for bucket in source.iterator(chunk_size=batch_size):
+                totals[bucket['day'], bucket['hour'], bucket['table_id']].update(
+                    revenue=bucket['revenue'] or 0,
+                    paid=bucket['paid'] or 0,
+                    games=bucket['games'],
+                    minutes=bucket['duration'].total_seconds() / 60 if bucket['duration'] else 0,
+                )
+
+        rollups = [
+            RevenueRollup(day=day, hour=hour, table_id=table_id, **{
+                field: values[field] for field in ('revenue', 'paid', 'games', 'minutes')
+            })
+            for (day, hour, table_id), values in totals.items()
+        ]
+        with transaction.atomic():
+            RevenueRollup.objects.all().delete()
+            RevenueRollup.objects.bulk_create(rollups, batch_size=batch_size)
+        # Cached reports are keyed on the parties version
+        versioning.bump(versioning.PARTIES)
+
+        self.stdout.write(self.style.SUCCESS(f"{len(rollups)} rollup rows rebuilt."))
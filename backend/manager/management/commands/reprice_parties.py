@@ -0,0 +1,56 @@
+import copy
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from manager.models import Parametres, Partie
+from manager.pricing import repricer
+from manager.views import parse_date_bound
+
+
+class Command(BaseCommand):
+    help = "Re-price finished game sessions with the current (or given) tariffs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="Only games started on or after this date (AAAA-MM-JJ).")
+        parser.add_argument('--until', help="Only games started on or before this date (AAAA-MM-JJ).")
+        parser.add_argument('--tarif-base', type=float, help="Override Parametres.tarif_base.")
+        parser.add_argument('--tarif-reduit', type=float, help="Override Parametres.tarif_reduit.")
+        parser.add_argument('--seuil-prix', type=float, help="Override Parametres.seuil_prix.")
+        parser.add_argument('--chunk-size', type=int, default=10000, help="Games per UPDATE.")
+        parser.add_argument('--samples', type=int, default=10, help="Example diffs to print.")
+        parser.add_argument('--dry-run', action='store_true', help="Report the changes without writing them.")
+
+    def handle(self, *args, **options):
+        config = copy.copy(Parametres.get_cached())
+        for option in ('tarif_base', 'tarif_reduit', 'seuil_prix'):
+            if options[option] is not None:
+                setattr(config, option, options[option])
+
+        queryset = Partie.objects.all()
+        if options['since']:
+            queryset = queryset.filter(date_debut__gte=parse_date_bound(options['since'], 'since'))
+        if options['until']:
+            queryset = queryset.filter(date_debut__lt=parse_date_bound(options['until'], 'until', end=True))
+
+        def progress(report):
+            self.stdout.write(f"  {report['scanned']} parties analysées, {report['changed']} à modifier")
+
+        report = repricer(
+            queryset, config,
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+            samples=options['samples'],
+            progress=progress if options['verbosity'] > 1 else None,
+        )
+
+        for sample in report['samples']:
+            self.stdout.write(f"  Partie {sample['id']}: {sample['prix']} -> {sample['nouveau_prix']}")
+        verb = "seraient modifiées" if options['dry_run'] else "modifiées"
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['changed']}/{report['scanned']} parties {verb}, écart total {report['delta']:+.0f}."
+        ))
+
+        if report['changed'] and not options['dry_run']:
+            call_command('rebuild_rollups', stdout=self.stdout)
+            call_command('rebuild_balances', stdout=self.stdout)
@@ -0,0 +1,117 @@
+import random
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from manager import versioning
+from manager.autocomplete import client_autocomplete
+from manager.models import Client, Parametres, Partie, Table, tarifer
+from manager.utils import normalize_name
+
+PRENOMS = (
+    'Ahmed', 'Ali', 'Amine', 'Anis', 'Aziz', 'Bilel', 'Chokri', 'Fares', 'Habib', 'Hamza',
+    'Hedi', 'Imed', 'Karim', 'Khaled', 'Lotfi', 'Mehdi', 'Mohamed', 'Mourad', 'Nabil', 'Nizar',
+    'Omar', 'Rami', 'Riadh', 'Sami', 'Slim', 'Sofiene', 'Tarek', 'Walid', 'Yassine', 'Zied',
+)
+NOMS = (
+    'Ayari', 'Baccouche', 'Ben Ali', 'Ben Salah', 'Bouazizi', 'Chaabane', 'Dridi', 'Gharbi',
+    'Hamdi', 'Jaziri', 'Jebali', 'Khelifi', 'Mabrouk', 'Mejri', 'Nasri', 'Ouerghi', 'Riahi',
+    'Saidi', 'Sassi', 'Tlili', 'Trabelsi', 'Zouari',
+)
+# Hall opening hours; games start between them
+OUVERTURE, FERMETURE = 10, 24
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic hall history (tables, clients, finished games) for benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tables', type=int, default=8, help="Tables to create.")
+        parser.add_argument('--days', type=int, default=90, help="Days of history, ending yesterday.")
+        parser.add_argument('--games-per-day', type=int, default=120, help="Games played per day in the hall.")
+        parser.add_argument('--clients', type=int, default=1500, help="Distinct clients losing games.")
+        parser.add_argument('--unpaid-rate', type=float, default=0.05, help="Share of games left unpaid.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, for reproducible data.")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows inserted per query.")
+
+    def handle(self, *args, **options):
+        if min(options['tables'], options['days'], options['games_per_day'], options['clients']) < 1:
+            raise CommandError("--tables, --days, --games-per-day et --clients doivent être positifs.")
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+
+        with transaction.atomic():
+            tables = self.create_tables(options['tables'])
+            clients = self.create_clients(rng, options['clients'], batch_size)
+            created = self.create_parties(rng, tables, clients, options, batch_size)
+
+        # Derived data is rebuilt the same way as after an import
+        call_command('rebuild_rollups', stdout=self.stdout)
+        call_command('rebuild_balances', stdout=self.stdout)
+        client_autocomplete.clear()
+        versioning.bump(versioning.TABLES, versioning.CLIENTS, versioning.PARTIES)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(tables)} tables, {len(clients)} clients et {created} parties générés "
+            f"(graine {options['seed']})."
+        ))
+
+    def create_tables(self, count):
+        numero = Table.objects.aggregate(max=Max('numero'))['max'] or 0
+        return Table.objects.bulk_create([
+            Table(numero=numero + i, nom=f"Table {numero + i}", prix_heure=9)
+            for i in range(1, count + 1)
+        ])
+
+    def create_clients(self, rng, count, batch_size):
+        """Create ``count`` clients with distinct names, reusing existing ones."""
+        existing = set(Client.objects.values_list('nom_normalise', flat=True))
+        noms = {}
+        while len(noms) < count:
+            nom = f"{rng.choice(PRENOMS)} {rng.choice(NOMS)}"
+            if len(noms) >= len(PRENOMS) * len(NOMS) // 2:
+                nom = f"{nom} {rng.randint(2, 999)}"
+            key = normalize_name(nom)
+            if key not in existing:
+                noms.setdefault(key, nom)
+        return Client.objects.bulk_create(
+            [Client(nom=nom, nom_normalise=key) for key, nom in noms.items()],
+            batch_size=batch_size,
+        )
+
+    def create_parties(self, rng, tables, clients, options, batch_size):
+        """Play ``games_per_day`` games a day, back to back on each table."""
+        config = Parametres.get_cached()
+        today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        per_table = max(1, options['games_per_day'] // len(tables))
+        batch = []
+        created = 0
+        for day in range(options['days'], 0, -1):
+            opening = today - timedelta(days=day) + timedelta(hours=OUVERTURE)
+            closing = opening + timedelta(hours=FERMETURE - OUVERTURE)
+            for table in tables:
+                debut = opening + timedelta(minutes=rng.randint(0, 90))
+                for _ in range(per_table):
+                    if debut >= closing:
+                        break
+                    duree = max(5, min(180, rng.gauss(45, 20)))
+                    fin = debut + timedelta(minutes=duree)
+                    batch.append(Partie(
+                        table=table,
+                        client=rng.choice(clients) if rng.random() < 0.9 else None,
+                        date_debut=debut,
+                        date_fin=fin,
+                        est_en_cours=False,
+                        prix=tarifer(duree, config.tarif_base, config.tarif_reduit, config.seuil_prix),
+                        est_paye=rng.random() >= options['unpaid_rate'],
+                    ))
+                    debut = fin + timedelta(minutes=rng.randint(1, 30))
+                if len(batch) >= batch_size:
+                    Partie.objects.bulk_create(batch)
+                    created += len(batch)
+                    batch = []
+        Partie.objects.bulk_create(batch)
+        return created + len(batch)
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:02
+
+from django.db import migrations, models
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import ExtractHour, TruncDate
+import django.db.models.deletion
+
+
+def fill_rollups(apps, schema_editor):
+    """Aggregate the existing finished games, as ``rebuild_rollups`` does."""
+    Partie = apps.get_model('manager', 'Partie')
+    RevenueRollup = apps.get_model('manager', 'RevenueRollup')
+    buckets = (
+        Partie.objects.filter(est_en_cours=False, date_fin__isnull=False).order_by()
+        .annotate(day=TruncDate('date_debut'), hour=ExtractHour('date_debut'))
+        .values('day', 'hour', 'table_id')
+        .annotate(
+            revenue=Sum('prix'),
+            paid=Sum('prix', filter=Q(est_paye=True)),
+            games=Count('id'),
+            duration=Sum(ExpressionWrapper(F('date_fin') - F('date_debut'), output_field=DurationField())),
+        )
+    )
+    RevenueRollup.objects.bulk_create(
+        (
+            RevenueRollup(
+                day=bucket['day'], hour=bucket['hour'], table_id=bucket['table_id'],
+                revenue=bucket['revenue'] or 0, paid=bucket['paid'] or 0, games=bucket['games'],
+                minutes=bucket['duration'].total_seconds() / 60 if bucket['duration'] else 0,
+            )
+            for bucket in buckets.iterator(chunk_size=1000)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0004_parametres'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevenueRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Jour')),
+                ('hour', models.PositiveSmallIntegerField(verbose_name='Heure')),
+                ('revenue', models.FloatField(default=0.0, verbose_name='Revenu')),
+                ('paid', models.FloatField(default=0.0, verbose_name='Encaissé')),
+                ('games', models.PositiveIntegerField(default=0, verbose_name='Parties')),
+                ('minutes', models.FloatField(default=0.0, verbose_name='Minutes jouées')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='manager.table', verbose_name='Table')),
+            ],
+            options={
+                'verbose_name': 'Agrégat de revenu',
+                'verbose_name_plural': 'Agrégats de revenu',
+                'ordering': ['-day', 'hour', 'table'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='revenuerollup',
+            constraint=models.UniqueConstraint(fields=('day', 'hour', 'table'), name='unique_rollup_bucket'),
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:03
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0005_revenuerollup'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='client',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('nom'), name='gin_trgm_ops'), name='client_nom_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='partie',
+            index=models.Index(fields=['-date_debut', 'id'], name='partie_date_debut_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='partie',
+            index=models.Index(condition=models.Q(('est_en_cours', True)), fields=['table'], name='partie_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='partie',
+            index=models.Index(condition=models.Q(('est_paye', False)), fields=['client'], name='partie_unpaid_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:04
+
+from django.db import migrations, models
+
+from manager.utils import normalize_name
+
+
+def fill_nom_normalise(apps, schema_editor):
+    Client = apps.get_model('manager', 'Client')
+    batch = []
+    for client in Client.objects.only('id', 'nom').iterator(chunk_size=2000):
+        client.nom_normalise = normalize_name(client.nom)[:100]
+        batch.append(client)
+        if len(batch) >= 2000:
+            Client.objects.bulk_update(batch, ['nom_normalise'])
+            batch = []
+    Client.objects.bulk_update(batch, ['nom_normalise'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0006_partie_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='nom_normalise',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100, verbose_name='Nom normalisé'),
+        ),
+        migrations.RunPython(fill_nom_normalise, migrations.RunPython.noop),
+    ]
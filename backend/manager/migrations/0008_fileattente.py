@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0007_client_nom_normalise'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileAttente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=100, verbose_name='Nom')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('client', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='manager.client', verbose_name='Client')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='file_attente', to='manager.table', verbose_name='Table')),
+            ],
+            options={
+                'verbose_name': "File d'attente",
+                'verbose_name_plural': "Files d'attente",
+                'ordering': ['table', 'id'],
+                'indexes': [models.Index(fields=['table', 'id'], name='fileattente_table_id_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:16
+
+from django.db import migrations
+
+from manager.dedup import duplicate_groups, merge_clients
+
+
+def merge_duplicates(apps, schema_editor):
+    Client = apps.get_model('manager', 'Client')
+    merge_clients(Client, duplicate_groups(Client))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0008_fileattente'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+    ]
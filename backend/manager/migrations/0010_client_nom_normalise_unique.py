@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0009_merge_duplicate_clients'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='client',
+            name='nom_normalise',
+            field=models.CharField(default='', editable=False, max_length=100, unique=True, verbose_name='Nom normalisé'),
+        ),
+    ]
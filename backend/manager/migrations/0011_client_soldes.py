@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:18
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_soldes(apps, schema_editor):
+    Client = apps.get_model('manager', 'Client')
+    Partie = apps.get_model('manager', 'Partie')
+    dues = Partie.objects.filter(client=OuterRef('pk'), est_en_cours=False, est_paye=False)\
+        .order_by().values('client')
+    Client.objects.update(
+        solde_du=Coalesce(Subquery(dues.annotate(total=Sum('prix')).values('total')), Value(0.0)),
+        parties_impayees=Coalesce(Subquery(dues.annotate(nombre=Count('id')).values('nombre')), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0010_client_nom_normalise_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='parties_impayees',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Parties impayées'),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='solde_du',
+            field=models.FloatField(default=0.0, editable=False, verbose_name='Solde dû'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('solde_du__gt', 0)), fields=['-solde_du'], name='client_debiteurs_idx'),
+        ),
+        migrations.RunPython(fill_soldes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0011_client_soldes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartieArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date_debut', models.DateTimeField(verbose_name='Date de début')),
+                ('date_fin', models.DateTimeField(verbose_name='Date de fin')),
+                ('prix', models.FloatField(verbose_name='Prix')),
+                ('next_player', models.CharField(blank=True, max_length=100, null=True, verbose_name='Prochain joueur')),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archivée le')),
+                ('client', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='manager.client', verbose_name='Client')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archives', to='manager.table', verbose_name='Table')),
+            ],
+            options={
+                'verbose_name': 'Partie archivée',
+                'verbose_name_plural': 'Parties archivées',
+                'ordering': ['-date_debut'],
+                'indexes': [models.Index(fields=['-date_debut', 'id'], name='archive_date_debut_id_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:35
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0012_partiearchive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('nom_normalise', name='gin_trgm_ops'), name='client_nom_normalise_trgm_idx'),
+        ),
+    ]
@@ -1,6 +1,41 @@
-from django.db import models
+import hashlib
+from collections import Counter, defaultdict
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.core.cache import cache
+from django.db.models.functions import Coalesce, Upper
 from django.utils import timezone
 
+from . import versioning
+from .utils import normalize_name
+
+# Durée (minutes) facturée au tarif de base avant le tarif réduit
+MINUTES_TARIF_BASE = 15
+# Prix plancher d'une partie
+PRIX_MINIMUM = 1000
+
+
+def tarifer(minutes, tarif_base, tarif_reduit, seuil_prix):
+    """Price a game of ``minutes`` with the tiered formula.
+
+    The first ``MINUTES_TARIF_BASE`` minutes cost ``tarif_base`` per minute,
+    the rest ``tarif_reduit``. Below ``PRIX_MINIMUM`` the game costs
+    ``PRIX_MINIMUM``; up to ``seuil_prix`` it costs ``seuil_prix``.
+    """
+    if minutes <= MINUTES_TARIF_BASE:
+        prix_brut = minutes * tarif_base
+    else:
+        prix_brut = (MINUTES_TARIF_BASE * tarif_base) + ((minutes - MINUTES_TARIF_BASE) * tarif_reduit)
+
+    if prix_brut < PRIX_MINIMUM:
+        return PRIX_MINIMUM
+    if prix_brut <= seuil_prix:
+        return seuil_prix
+    # Python rounds halves to even; pricing.RoundHalfEven does the same in SQL
+    return round(prix_brut)
+
 
 class Table(models.Model):
     """Model representing a billiard table."""
@@ -38,22 +73,143 @@ class Parametres(models.Model):
     def __str__(self):
         return "Configuration Générale"
 
+    # (version, instance) of the configuration last loaded by this process
+    _cached = None
+
+    @classmethod
+    def get_cached(cls):
+        """Return the configuration singleton without a query per call.
+
+        The instance is kept in process memory and in the shared cache, both
+        stamped with the ``parametres`` change version. Saving the
+        configuration bumps that version, so every worker reloads it on its
+        next call, as long as the workers share the cache (``REDIS_URL``,
+        required in production). The returned instance must be treated as
+        read-only.
+        """
+        version, = versioning.get_versions(versioning.PARAMETRES)
+        cached = cls._cached
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        key = f'manager:parametres:{version}'
+        config = cache.get(key)
+        if config is None:
+            config, created = cls.objects.get_or_create(id=1)
+            cache.set(key, config, timeout=24 * 3600)
+        cls._cached = (version, config)
+        return config
+
 
 class Client(models.Model):
     """Model representing a client."""
     nom = models.CharField(max_length=100, verbose_name="Nom")
+    nom_normalise = models.CharField(max_length=100, unique=True, editable=False, default="",
+                                     verbose_name="Nom normalisé")
     telephone = models.CharField(max_length=20, verbose_name="Téléphone", blank=True, default="")
     email = models.EmailField(blank=True, null=True, verbose_name="Email")
+    # Total and count of the client's finished unpaid games, kept up to date
+    # by every path that stops, pays, edits or deletes a game
+    solde_du = models.FloatField(default=0.0, editable=False, verbose_name="Solde dû")
+    parties_impayees = models.IntegerField(default=0, editable=False, verbose_name="Parties impayées")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Client"
         verbose_name_plural = "Clients"
+        indexes = [
+            # Trigram index on UPPER(nom), the expression nom__icontains compiles to
+            GinIndex(OpClass(Upper('nom'), name='gin_trgm_ops'), name='client_nom_trgm_idx'),
+            # Serves the autocomplete's word-start LIKE '% key%', which no btree can
+            GinIndex(OpClass('nom_normalise', name='gin_trgm_ops'), name='client_nom_normalise_trgm_idx'),
+            models.Index(fields=['-solde_du'], name='client_debiteurs_idx', condition=Q(solde_du__gt=0)),
+        ]
 
     def __str__(self):
         return self.nom
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored key so a rename can evict the old cached searches
+        instance._nom_normalise_initial = instance.__dict__.get('nom_normalise')
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.nom_normalise = normalize_name(self.nom)[:100]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'nom' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'nom_normalise'}
+        super().save(*args, **kwargs)
+
+    # Seconds a name -> client resolution stays in the shared cache
+    CACHE_TIMEOUT = 3600
+
+    @staticmethod
+    def cache_key(nom_normalise):
+        digest = hashlib.md5(nom_normalise.encode()).hexdigest()
+        return f'manager:client:{digest}'
+
+    @classmethod
+    def par_nom(cls, nom):
+        """Return the client called ``nom``, creating it if needed.
+
+        Names are matched on ``nom_normalise``, so "Ali", "ali " and "ALI"
+        are the same client. Resolutions are kept in the shared cache and
+        evicted when the client is renamed or deleted, so the stop path
+        usually resolves the loser without a query. A cached id is only a
+        hint: a transaction failing on it calls ``oublier`` and retries.
+        """
+        key = normalize_name(nom)[:100]
+        cache_key = cls.cache_key(key)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cls.from_db(None, ['id', 'nom', 'nom_normalise'], [*cached, key])
+
+        client, created = cls.objects.get_or_create(nom_normalise=key, defaults={'nom': nom.strip()[:100]})
+        # Only once committed: a rolled-back creation must not leave its id behind
+        transaction.on_commit(
+            lambda: cache.set(cache_key, (client.pk, client.nom), timeout=cls.CACHE_TIMEOUT)
+        )
+        return client
+
+    @classmethod
+    def oublier(cls, *clients):
+        """Drop the cached name resolutions of ``clients``."""
+        cache.delete_many([cls.cache_key(client.nom_normalise) for client in clients if client is not None])
+
+    @classmethod
+    def ajuster_soldes(cls, dettes):
+        """Apply ``(client_id, montant, parties)`` deltas with one UPDATE."""
+        deltas = defaultdict(Counter)
+        for client_id, montant, parties in dettes:
+            if client_id and parties:
+                deltas[client_id].update(montant=montant, parties=parties)
+        if not deltas:
+            return
+        cls.objects.filter(pk__in=deltas).update(
+            solde_du=F('solde_du') + Case(
+                *[When(pk=client_id, then=Value(float(delta['montant']))) for client_id, delta in deltas.items()],
+                default=Value(0.0), output_field=models.FloatField(),
+            ),
+            parties_impayees=F('parties_impayees') + Case(
+                *[When(pk=client_id, then=Value(delta['parties'])) for client_id, delta in deltas.items()],
+                default=Value(0), output_field=models.IntegerField(),
+            ),
+        )
+
+    @classmethod
+    def recalculer_soldes(cls, queryset=None):
+        """Recompute the balances of ``queryset`` (all clients by default) from their games."""
+        dues = Partie.objects.filter(client=OuterRef('pk'), est_en_cours=False, est_paye=False)\
+            .order_by().values('client')
+        queryset = cls.objects.all() if queryset is None else queryset
+        return queryset.update(
+            solde_du=Coalesce(Subquery(dues.annotate(total=Sum('prix')).values('total')), Value(0.0)),
+            parties_impayees=Coalesce(Subquery(dues.annotate(nombre=Count('id')).values('nombre')), Value(0)),
+        )
+
 
 class Partie(models.Model):
     """Model representing a billiard game session."""
@@ -72,6 +228,11 @@ class Partie(models.Model):
         verbose_name = "Partie"
         verbose_name_plural = "Parties"
         ordering = ['-date_debut']
+        indexes = [
+            models.Index(fields=['-date_debut', 'id'], name='partie_date_debut_id_idx'),
+            models.Index(fields=['table'], condition=Q(est_en_cours=True), name='partie_active_idx'),
+            models.Index(fields=['client'], condition=Q(est_paye=False), name='partie_unpaid_idx'),
+        ]
 
     def __str__(self):
         client_name = self.client.nom if self.client else "Pas de client"
@@ -83,49 +244,447 @@ class Partie(models.Model):
             return (self.date_fin - self.date_debut).total_seconds() / 60
         return 0
 
-    def calculer_prix(self):
-        """Calcule le prix selon la nouvelle formule.
-        0-15 min: 150 mil/min
-        Après 15 min: 135 mil/min
+    def prix_selon_tarif(self):
+        """Calcule le prix selon la formule et les tarifs des Paramètres.
+        0-15 min: tarif_base mil/min (150)
+        Après 15 min: tarif_reduit mil/min (135)
         Min 1000 si prix < 1000
-        Fixe 1500 si prix entre 1000 et 1500
+        Fixe seuil_prix si prix entre 1000 et seuil_prix (1500)
         """
-        if self.date_fin and self.date_debut:
-            diff = self.date_fin - self.date_debut
-            minutes = diff.total_seconds() / 60
-            
-            # Calcul de base
-            if minutes <= 15:
-                prix_brut = minutes * 150
-            else:
-                prix_brut = (15 * 150) + ((minutes - 15) * 135)
-            
-            # Application des paliers
-            if prix_brut < 1000:
-                self.prix = 1000
-            elif 1000 <= prix_brut <= 1500:
-                self.prix = 1500
-            else:
-                self.prix = round(prix_brut)
-            
-            self.save()
+        config = Parametres.get_cached()
+        return tarifer(self.duree_minutes, config.tarif_base, config.tarif_reduit, config.seuil_prix)
+
+    @classmethod
+    def demarrer(cls, table_id, client=None, next_player=None):
+        """Start a game on a table, or return None if the table is not available.
+
+        The table is claimed with a conditional UPDATE, so two concurrent
+        starts on the same table cannot both succeed.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            claimed = Table.objects.filter(id=table_id, est_disponible=True)\
+                .update(est_disponible=False, updated_at=now)
+            if not claimed:
+                return None
+            partie = cls.objects.create(
+                table_id=table_id, client=client, next_player=next_player,
+                date_debut=now, est_en_cours=True, prix=0,
+            )
+            transaction.on_commit(lambda: versioning.bump(versioning.TABLES))
+        return partie
 
     def stop_partie(self, loser_name=None):
-        """Stop the game session and calculate total price."""
-        if self.est_en_cours:
-            self.date_fin = timezone.now()
+        """Stop the game session and calculate total price.
+
+        Returns False if the game was already stopped, possibly by a
+        concurrent request. The game and its table are each updated with a
+        single conditional UPDATE inside one transaction.
+        """
+        if not self.est_en_cours:
+            return False
+
+        now = timezone.now()
+        with transaction.atomic():
+            # Create client if loser_name provided
+            if loser_name:
+                self.client = Client.par_nom(loser_name)
+
+            self.date_fin = now
+            self.prix = self.prix_selon_tarif()
+            stopped = Partie.objects.filter(pk=self.pk, est_en_cours=True).update(
+                date_fin=now, est_en_cours=False, prix=self.prix, client=self.client, updated_at=now,
+            )
+            if not stopped:
+                self.refresh_from_db()
+                return False
             self.est_en_cours = False
-            
-            # Calcul du prix selon la formule
-            self.calculer_prix()
-            
+            self.updated_at = now
+
             # Update table availability
+            Table.objects.filter(pk=self.table_id).update(est_disponible=True, updated_at=now)
             self.table.est_disponible = True
-            self.table.save()
-            
-            # Create client if loser_name provided
-            if loser_name:
-                client, created = Client.objects.get_or_create(nom=loser_name)
-                self.client = client
-            
-            self.save()
+            self.table.updated_at = now
+
+            RevenueRollup.apply(self)
+            Client.ajuster_soldes([self.dette()])
+            transaction.on_commit(lambda: versioning.bump(versioning.PARTIES, versioning.TABLES))
+        return True
+
+    def payer(self):
+        """Mark the game session as paid and account for it in the rollups."""
+        now = timezone.now()
+        with transaction.atomic():
+            if not Partie.objects.filter(pk=self.pk, est_paye=False).update(est_paye=True, updated_at=now):
+                self.est_paye = True
+                return False
+            dette = self.dette(sign=-1)
+            self.est_paye = True
+            self.updated_at = now
+            if not self.est_en_cours:
+                RevenueRollup.record(self, paid=self.prix)
+            Client.ajuster_soldes([dette])
+            transaction.on_commit(lambda: versioning.bump(versioning.PARTIES))
+        return True
+
+    @classmethod
+    def payer_plusieurs(cls, ids):
+        """Mark several games as paid with one UPDATE.
+
+        Returns ``(results, paid)``: the outcome for each requested id
+        (``paid``, ``already_paid`` or ``not_found``) and the games paid.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            parties = {
+                partie.id: partie
+                for partie in cls.objects.select_related('table', 'client')
+                .select_for_update(of=('self',)).filter(id__in=ids)
+            }
+            paid = [partie for partie in parties.values() if not partie.est_paye]
+            cls.objects.filter(id__in=[partie.id for partie in paid]).update(est_paye=True, updated_at=now)
+            Client.ajuster_soldes(partie.dette(sign=-1) for partie in paid)
+            for partie in paid:
+                partie.est_paye = True
+                partie.updated_at = now
+            RevenueRollup.record_many((partie, {'paid': partie.prix}) for partie in paid if not partie.est_en_cours)
+            if paid:
+                transaction.on_commit(lambda: versioning.bump(versioning.PARTIES))
+
+        paid_ids = {partie.id for partie in paid}
+        results = {}
+        for partie_id in ids:
+            if partie_id not in parties:
+                results[partie_id] = 'not_found'
+            elif partie_id in paid_ids:
+                results[partie_id] = 'paid'
+            else:
+                results[partie_id] = 'already_paid'
+        return results, paid
+
+    @classmethod
+    def arreter_tables(cls, table_ids):
+        """Stop every active game on the given tables.
+
+        Prices are computed in memory and written with one UPDATE for the
+        games and one for the tables. Returns the stopped games.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            parties = list(
+                cls.objects.select_related('table', 'client').select_for_update(of=('self',))
+                .filter(table_id__in=table_ids, est_en_cours=True)
+            )
+            if not parties:
+                return []
+            for partie in parties:
+                partie.date_fin = now
+                partie.prix = partie.prix_selon_tarif()
+                partie.est_en_cours = False
+                partie.updated_at = now
+                partie.table.est_disponible = True
+                partie.table.updated_at = now
+
+            cls.objects.filter(id__in=[partie.id for partie in parties]).update(
+                date_fin=now,
+                est_en_cours=False,
+                prix=Case(*[When(id=partie.id, then=Value(partie.prix)) for partie in parties]),
+                updated_at=now,
+            )
+            Table.objects.filter(id__in={partie.table_id for partie in parties})\
+                .update(est_disponible=True, updated_at=now)
+            RevenueRollup.record_many((partie, partie.rollup_contribution()) for partie in parties)
+            Client.ajuster_soldes(partie.dette() for partie in parties)
+            transaction.on_commit(lambda: versioning.bump(versioning.PARTIES, versioning.TABLES))
+        return parties
+
+    @classmethod
+    def definir_prochains_joueurs(cls, next_players):
+        """Set ``next_player`` on several games at once.
+
+        ``next_players`` maps game ids to names. Returns the ids updated.
+        """
+        if not next_players:
+            return []
+        with transaction.atomic():
+            updated = list(cls.objects.filter(id__in=next_players).values_list('id', flat=True))
+            cls.objects.filter(id__in=updated).update(
+                next_player=Case(*[When(id=pk, then=Value(name)) for pk, name in next_players.items()]),
+                updated_at=timezone.now(),
+            )
+            if updated:
+                transaction.on_commit(lambda: versioning.bump(versioning.PARTIES))
+        return updated
+
+    def dette(self, sign=1):
+        """``(client_id, montant, parties)`` the game adds to its client's balance.
+
+        Only finished unpaid games with a client are owed; for the others the
+        deltas are zero.
+        """
+        if self.client_id is None or self.est_en_cours or self.est_paye:
+            return self.client_id, 0, 0
+        return self.client_id, sign * self.prix, sign
+
+    def rollup_contribution(self):
+        """Deltas a finished game adds to its rollup bucket."""
+        return {
+            'revenue': self.prix,
+            'paid': self.prix if self.est_paye else 0,
+            'games': 1,
+            'minutes': self.duree_minutes,
+        }
+
+
+class PartieArchive(models.Model):
+    """Settled game session moved out of ``Partie`` by ``archive_parties``.
+
+    Keeps the original id. Archived games are finished and paid, so they
+    only matter to history: their revenue stays in the rollups and
+    ``rebuild_rollups`` reads them alongside the live table.
+    """
+    # Fields copied from Partie when a game is archived
+    CHAMPS = ('id', 'table_id', 'client_id', 'date_debut', 'date_fin', 'prix', 'next_player',
+              'created_at', 'updated_at')
+
+    id = models.BigIntegerField(primary_key=True)
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='archives', verbose_name="Table")
+    client = models.ForeignKey(Client, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Client")
+    date_debut = models.DateTimeField(verbose_name="Date de début")
+    date_fin = models.DateTimeField(verbose_name="Date de fin")
+    prix = models.FloatField(verbose_name="Prix")
+    next_player = models.CharField(max_length=100, blank=True, null=True, verbose_name="Prochain joueur")
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Archivée le")
+
+    class Meta:
+        verbose_name = "Partie archivée"
+        verbose_name_plural = "Parties archivées"
+        ordering = ['-date_debut']
+        indexes = [
+            models.Index(fields=['-date_debut', 'id'], name='archive_date_debut_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"Partie archivée {self.id} - Table {self.table_id}"
+
+    @classmethod
+    def archiver(cls, avant, batch_size=1000, progress=None):
+        """Move the paid games finished before ``avant`` out of ``Partie``.
+
+        Each batch is copied and deleted in one transaction, so a game is
+        always in exactly one of the two tables: an id already archived
+        raises ``IntegrityError`` and leaves its batch in place. Rows locked
+        by a concurrent request are skipped and picked up by the next run.
+        Returns the number of games archived.
+        """
+        total = 0
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    Partie.objects.select_for_update(skip_locked=True)
+                    .filter(est_en_cours=False, est_paye=True, date_fin__lt=avant)
+                    .order_by('id').values(*cls.CHAMPS)[:batch_size]
+                )
+                if not rows:
+                    break
+                cls.objects.bulk_create([cls(**row) for row in rows])
+                # Nothing references Partie, so one DELETE is enough: no rows
+                # loaded and no post_delete version bump per game
+                Partie.objects.filter(id__in=[row['id'] for row in rows])._raw_delete(Partie.objects.db)
+                transaction.on_commit(lambda: versioning.bump(versioning.PARTIES))
+            total += len(rows)
+            if progress:
+                progress(total)
+        return total
+
+
+class FileAttente(models.Model):
+    """Entry of a table's waiting queue, served first in, first out."""
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='file_attente', verbose_name="Table")
+    nom = models.CharField(max_length=100, verbose_name="Nom")
+    client = models.ForeignKey(Client, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Client")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Durée supposée d'une partie quand la table n'a pas encore d'historique
+    DUREE_PAR_DEFAUT = 30
+
+    class Meta:
+        verbose_name = "File d'attente"
+        verbose_name_plural = "Files d'attente"
+        ordering = ['table', 'id']
+        indexes = [
+            models.Index(fields=['table', 'id'], name='fileattente_table_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.nom} - Table {self.table_id}"
+
+    @classmethod
+    def ajouter(cls, table_id, nom):
+        """Append a player to the end of a table's queue."""
+        return cls.objects.create(table_id=table_id, nom=nom)
+
+    @classmethod
+    def retirer_premier(cls, table_id):
+        """Pop the head of a table's queue, or return None if it is empty.
+
+        The head row is locked (skipping rows locked by a concurrent pop), so
+        two requests never hand out the same entry.
+        """
+        with transaction.atomic():
+            entry = cls.objects.select_for_update(skip_locked=True)\
+                .filter(table_id=table_id).order_by('id').first()
+            if entry is not None:
+                entry_id = entry.id
+                entry.delete()
+                entry.id = entry_id
+        return entry
+
+    @classmethod
+    def estimer(cls, table_id):
+        """Return the queue of a table, each entry carrying ``attente_minutes``.
+
+        The estimate uses the table's average game length from the rollups:
+        what remains of the current game, plus one average game per player
+        ahead in the queue.
+        """
+        entries = list(cls.objects.filter(table_id=table_id).order_by('id'))
+        if not entries:
+            return entries
+
+        totals = RevenueRollup.objects.filter(table_id=table_id).aggregate(
+            minutes=models.Sum('minutes'), games=models.Sum('games'),
+        )
+        moyenne = totals['minutes'] / totals['games'] if totals['games'] else cls.DUREE_PAR_DEFAUT
+
+        en_cours = Partie.objects.filter(table_id=table_id, est_en_cours=True)\
+            .values_list('date_debut', flat=True).first()
+        restant = 0
+        if en_cours:
+            ecoule = (timezone.now() - en_cours).total_seconds() / 60
+            restant = max(moyenne - ecoule, 0)
+
+        for position, entry in enumerate(entries):
+            entry.attente_minutes = round(restant + position * moyenne)
+        return entries
+
+
+class RevenueRollup(models.Model):
+    """Pre-aggregated revenue of finished games, bucketed by day, hour and table.
+
+    Rows are incremented as games are stopped and paid, so statistics read a
+    few thousand buckets instead of scanning every Partie.
+    """
+    day = models.DateField(verbose_name="Jour")
+    hour = models.PositiveSmallIntegerField(verbose_name="Heure")
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='rollups', verbose_name="Table")
+    revenue = models.FloatField(default=0.0, verbose_name="Revenu")
+    paid = models.FloatField(default=0.0, verbose_name="Encaissé")
+    games = models.PositiveIntegerField(default=0, verbose_name="Parties")
+    minutes = models.FloatField(default=0.0, verbose_name="Minutes jouées")
+
+    class Meta:
+        verbose_name = "Agrégat de revenu"
+        verbose_name_plural = "Agrégats de revenu"
+        ordering = ['-day', 'hour', 'table']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'hour', 'table'], name='unique_rollup_bucket'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.hour}h - Table {self.table_id}"
+
+    # Fields a game contributes to, with the type of their deltas
+    DELTA_FIELDS = {
+        'revenue': models.FloatField(),
+        'paid': models.FloatField(),
+        'games': models.IntegerField(),
+        'minutes': models.FloatField(),
+    }
+
+    @staticmethod
+    def bucket_for(partie):
+        """Return the (day, hour, table_id) bucket a game is accounted in."""
+        debut = timezone.localtime(partie.date_debut)
+        return debut.date(), debut.hour, partie.table_id
+
+    @classmethod
+    def apply(cls, partie, sign=1):
+        """Add (or with ``sign=-1`` withdraw) the whole contribution of a game."""
+        if partie.est_en_cours or not partie.date_fin:
+            return
+        contribution = partie.rollup_contribution()
+        cls.record(partie, **{field: sign * value for field, value in contribution.items()})
+
+    @classmethod
+    def record(cls, partie, revenue=0, paid=0, games=0, minutes=0):
+        """Add the given deltas to the bucket of ``partie``, creating it if needed."""
+        cls.record_bucket(*cls.bucket_for(partie), revenue=revenue, paid=paid, games=games, minutes=minutes)
+
+    @classmethod
+    def record_many(cls, entries):
+        """Record ``(partie, deltas)`` pairs in a fixed number of queries.
+
+        Missing buckets are created empty by a single INSERT that skips the
+        ones already there, including those a concurrent worker has just
+        created. Then a single UPDATE with one ``CASE`` per field adds the
+        deltas to every bucket, whatever the number of games and buckets.
+        """
+        buckets = defaultdict(Counter)
+        for partie, deltas in entries:
+            buckets[cls.bucket_for(partie)].update(deltas)
+        if len(buckets) <= 1:
+            # A single bucket is usually one UPDATE, without the INSERT
+            for bucket, deltas in buckets.items():
+                cls.record_bucket(*bucket, **deltas)
+            return
+
+        cls.objects.bulk_create(
+            [cls(day=day, hour=hour, table_id=table_id) for day, hour, table_id in buckets],
+            ignore_conflicts=True,
+        )
+        cls.increment(buckets)
+
+    @staticmethod
+    def matching(buckets):
+        condition = Q()
+        for day, hour, table_id in buckets:
+            condition |= Q(day=day, hour=hour, table_id=table_id)
+        return condition
+
+    @classmethod
+    def increment(cls, buckets):
+        """Add ``{(day, hour, table_id): deltas}`` to existing buckets with one UPDATE."""
+        updates = {}
+        for field, output_field in cls.DELTA_FIELDS.items():
+            whens = [
+                When(Q(day=day, hour=hour, table_id=table_id), then=Value(deltas[field]))
+                for (day, hour, table_id), deltas in buckets.items() if deltas[field]
+            ]
+            if whens:
+                updates[field] = F(field) + Case(*whens, default=Value(0), output_field=output_field)
+        if updates:
+            cls.objects.filter(cls.matching(buckets)).update(**updates)
+
+    @classmethod
+    def record_bucket(cls, day, hour, table_id, revenue=0, paid=0, games=0, minutes=0):
+        deltas = {
+            'revenue': F('revenue') + revenue,
+            'paid': F('paid') + paid,
+            'games': F('games') + games,
+            'minutes': F('minutes') + minutes,
+        }
+        bucket = cls.objects.filter(day=day, hour=hour, table_id=table_id)
+        if bucket.update(**deltas):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    day=day, hour=hour, table_id=table_id,
+                    revenue=revenue, paid=paid, games=games, minutes=minutes,
+                )
+        except IntegrityError:
+            # Another worker created the bucket in the meantime.
+            bucket.update(**deltas)
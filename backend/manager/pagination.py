@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PartieCursorPagination(CursorPagination):
+    """Keyset pagination for game sessions, newest first.
+
+    The cursor is positioned on ``date_debut`` with ``id`` as tie-breaker, so
+    fetching a page costs the same whatever the size of the history.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-date_debut', 'id')
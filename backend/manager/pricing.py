@@ -0,0 +1,100 @@
+"""Set-based pricing of finished games, evaluated by the database.
+
+``prix_expression`` mirrors ``tarifer`` as a SQL ``CASE`` so that a whole
+range of games is re-priced by one ``UPDATE`` instead of a Python loop.
+"""
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Func, Max, Min, Sum, Value, When
+from django.db.models.lookups import LessThan, LessThanOrEqual
+
+from . import versioning
+from .models import MINUTES_TARIF_BASE, PRIX_MINIMUM
+
+
+class DureeMinutes(Func):
+    """Elapsed minutes between ``date_debut`` and ``date_fin``."""
+    template = "EXTRACT(EPOCH FROM (%(expressions)s)) / 60.0"
+    arg_joiner = ' - '
+    output_field = FloatField()
+
+    def __init__(self, **extra):
+        super().__init__(F('date_fin'), F('date_debut'), **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # Django's exact microsecond difference; julianday() is only precise
+        # to a few milliseconds, enough to tip a price sitting on a half
+        return self.as_sql(
+            compiler, connection,
+            template="django_timestamp_diff(%(expressions)s) / 60000000.0",
+            arg_joiner=', ',
+            **extra_context,
+        )
+
+
+class RoundHalfEven(Func):
+    """Round to the nearest integer, halves to even, like Python's ``round``.
+
+    PostgreSQL rounds a ``double precision`` half to even, but a ``numeric``
+    half away from zero, so the argument is cast explicitly. SQLite's
+    ``ROUND`` always goes away from zero: even halves are brought back down.
+    """
+    template = "ROUND((%(expressions)s)::double precision)"
+    output_field = FloatField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        entier = f"CAST({sql} AS INTEGER)"
+        demi_pair = f"CASE WHEN ({sql}) - {entier} = 0.5 AND {entier} / 2 * 2 = {entier} THEN 1 ELSE 0 END"
+        return f"(ROUND({sql}) - {demi_pair})", (*params, *params, *params, *params, *params)
+
+
+def prix_expression(tarif_base, tarif_reduit, seuil_prix):
+    """Return the SQL equivalent of ``tarifer`` for the current row."""
+    minutes = DureeMinutes()
+    prix_brut = Case(
+        When(LessThanOrEqual(minutes, MINUTES_TARIF_BASE), then=minutes * Value(tarif_base)),
+        default=Value(MINUTES_TARIF_BASE * tarif_base) + (minutes - Value(MINUTES_TARIF_BASE)) * Value(tarif_reduit),
+        output_field=FloatField(),
+    )
+    return Case(
+        When(LessThan(prix_brut, PRIX_MINIMUM), then=Value(float(PRIX_MINIMUM))),
+        When(LessThanOrEqual(prix_brut, seuil_prix), then=Value(float(seuil_prix))),
+        default=RoundHalfEven(prix_brut),
+        output_field=FloatField(),
+    )
+
+
+def repricer(queryset, config, chunk_size=10000, dry_run=False, samples=0, progress=None):
+    """Re-price the finished games of ``queryset`` with the tariffs of ``config``.
+
+    Games are processed by primary-key ranges of ``chunk_size``, each with a
+    single ``UPDATE`` restricted to rows whose price actually changes, so
+    memory stays bounded whatever the size of the history. With ``dry_run``
+    nothing is written. Returns a report with the number of games scanned
+    and changed, the total price delta and up to ``samples`` example diffs.
+    """
+    expression = prix_expression(config.tarif_base, config.tarif_reduit, config.seuil_prix)
+    queryset = queryset.order_by().filter(est_en_cours=False, date_fin__isnull=False)
+    bounds = queryset.aggregate(first=Min('id'), last=Max('id'))
+    report = {'scanned': 0, 'changed': 0, 'delta': 0.0, 'samples': []}
+    if bounds['first'] is None:
+        return report
+
+    for start in range(bounds['first'], bounds['last'] + 1, chunk_size):
+        chunk = queryset.filter(id__gte=start, id__lt=start + chunk_size)
+        changed = chunk.annotate(nouveau_prix=expression).exclude(prix=F('nouveau_prix'))
+        with transaction.atomic():
+            totals = changed.aggregate(count=Count('id'), delta=Sum(F('nouveau_prix') - F('prix')))
+            report['scanned'] += chunk.count()
+            report['changed'] += totals['count']
+            report['delta'] += totals['delta'] or 0
+            if len(report['samples']) < samples:
+                report['samples'] += changed.values('id', 'prix', 'nouveau_prix')[:samples - len(report['samples'])]
+            if totals['count'] and not dry_run:
+                chunk.exclude(prix=expression).update(prix=expression)
+        if progress:
+            progress(report)
+
+    if report['changed'] and not dry_run:
+        versioning.bump(versioning.PARTIES)
+    return report
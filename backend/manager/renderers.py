@@ -0,0 +1,21 @@
+from rest_framework.renderers import BaseRenderer
+
+
+class CSVRenderer(BaseRenderer):
+    """Declares ``?format=csv``; the export streams its own body and renders errors as JSON."""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Declares ``?format=ndjson``; the export streams its own body and renders errors as JSON."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
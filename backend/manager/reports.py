@@ -0,0 +1,153 @@
+"""Revenue and utilization reports over arbitrary date ranges.
+
+Reports are aggregated in the database from the hourly revenue rollups,
+grouped by day, ISO week or month, so a monthly report reads at most a few
+hundred rollup rows per table and never touches ``Partie``. Results are
+cached per (range, granularity, breakdown) and stamped with the parties
+and tables change versions, so any write invalidates them.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import DateField, F, Sum
+from django.db.models.functions import Trunc
+
+from . import versioning
+from .models import RevenueRollup, Table
+
+GRANULARITIES = ('day', 'week', 'month')
+# Upper bound on the number of periods a single report may return
+MAX_PERIODS = 400
+REPORT_CACHE_TIMEOUT = 10 * 60
+
+
+def period_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_period(start, granularity):
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    if granularity == 'month':
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def periods(since, until, granularity):
+    """Yield ``(start, days)`` for each period overlapping ``[since, until]``.
+
+    ``days`` only counts the days inside the range, so partial first and last
+    periods get a proportional occupancy.
+    """
+    start = period_start(since, granularity)
+    while start <= until:
+        end = next_period(start, granularity)
+        yield start, (min(end - timedelta(days=1), until) - max(start, since)).days + 1
+        start = end
+
+
+def count_periods(since, until, granularity):
+    if granularity == 'month':
+        return (until.year - since.year) * 12 + until.month - since.month + 1
+    span = (period_start(until, granularity) - period_start(since, granularity)).days
+    return span // (7 if granularity == 'week' else 1) + 1
+
+
+def _metrics(revenue, paid, games, minutes, available_minutes):
+    return {
+        'revenue': float(revenue or 0),
+        'paid': float(paid or 0),
+        'games': games or 0,
+        'minutes': round(minutes or 0, 1),
+        'avg_duration': round(minutes / games, 1) if games else 0,
+        'occupancy': round(minutes / available_minutes, 4) if available_minutes and minutes else 0,
+    }
+
+
+def _rollup_rows(since, until, granularity, by_table):
+    if granularity == 'day':
+        periode = F('day')
+    else:
+        periode = Trunc('day', granularity, output_field=DateField())
+    group = ('periode', 'table_id') if by_table else ('periode',)
+    return (
+        RevenueRollup.objects.order_by()
+        .filter(day__gte=since, day__lte=until)
+        .annotate(periode=periode)
+        .values(*group)
+        .annotate(revenue=Sum('revenue'), paid=Sum('paid'), games=Sum('games'), minutes=Sum('minutes'))
+    )
+
+
+def compute_report(since, until, granularity='day', by_table=False):
+    """Revenue, games, average duration and occupancy for each period of a range.
+
+    ``since`` and ``until`` are inclusive dates. Occupancy is the share of
+    the tables' calendar time spent in play (all tables, or one table in
+    the per-table breakdown).
+    """
+    key = 'manager:report:{}:{}:{}:{}:{}'.format(
+        since, until, granularity, int(by_table),
+        '.'.join(map(str, versioning.get_versions(versioning.PARTIES, versioning.TABLES))),
+    )
+    report = cache.get(key)
+    if report is None:
+        report = _build_report(since, until, granularity, by_table)
+        cache.set(key, report, timeout=REPORT_CACHE_TIMEOUT)
+    return report
+
+
+def _build_report(since, until, granularity, by_table):
+    tables = dict(Table.objects.order_by('numero').values_list('id', 'nom'))
+    rows = {}
+    for row in _rollup_rows(since, until, granularity, by_table):
+        rows[row['periode'], row.get('table_id')] = row
+
+    result = []
+    totals = {'revenue': 0, 'paid': 0, 'games': 0, 'minutes': 0}
+    table_totals = {table_id: dict.fromkeys(totals, 0) for table_id in tables}
+    days_total = 0
+    for start, days in periods(since, until, granularity):
+        days_total += days
+        table_minutes = days * 24 * 60
+        if by_table:
+            per_table = {table_id: rows.get((start, table_id), {}) for table_id in tables}
+        else:
+            per_table = {}
+        sums = rows.get((start, None)) or {
+            field: sum(row.get(field) or 0 for row in per_table.values()) for field in totals
+        }
+
+        period = {'periode': start, 'days': days}
+        period.update(_metrics(*(sums.get(field) for field in totals), table_minutes * len(tables)))
+        if by_table:
+            period['tables'] = [
+                {'table': table_id, 'table_nom': nom,
+                 **_metrics(*(per_table[table_id].get(field) for field in totals), table_minutes)}
+                for table_id, nom in tables.items()
+            ]
+            for table_id, row in per_table.items():
+                for field in totals:
+                    table_totals[table_id][field] += row.get(field) or 0
+        for field in totals:
+            totals[field] += sums.get(field) or 0
+        result.append(period)
+
+    report = {
+        'since': since,
+        'until': until,
+        'granularity': granularity,
+        'totals': _metrics(*totals.values(), days_total * 24 * 60 * len(tables)),
+        'periods': result,
+    }
+    if by_table:
+        report['totals']['tables'] = [
+            {'table': table_id, 'table_nom': nom,
+             **_metrics(*table_totals[table_id].values(), days_total * 24 * 60)}
+            for table_id, nom in tables.items()
+        ]
+    return report
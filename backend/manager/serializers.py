@@ -1,5 +1,22 @@
 from rest_framework import serializers
-from .models import Table, Client, Partie, Parametres
+from django.utils import timezone
+from .models import Table, Client, Partie, Parametres, FileAttente
+from .utils import normalize_name
+
+
+def format_duree(est_en_cours, date_debut, date_fin):
+    """Format the elapsed or final duration of a game as ``"1h 05min"``."""
+    if est_en_cours:
+        duration = timezone.now() - date_debut
+    elif date_fin:
+        duration = date_fin - date_debut
+    else:
+        return "0min"
+
+    total_seconds = duration.total_seconds()
+    hours = int(total_seconds // 3600)
+    minutes = int((total_seconds % 3600) // 60)
+    return f"{hours}h {minutes}min"
 
 
 class ParametresSerializer(serializers.ModelSerializer):
@@ -22,8 +39,17 @@ class ClientSerializer(serializers.ModelSerializer):
     """Serializer for Client model."""
     class Meta:
         model = Client
-        fields = ['id', 'nom', 'telephone', 'email', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        fields = ['id', 'nom', 'telephone', 'email', 'solde_du', 'parties_impayees', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'solde_du', 'parties_impayees', 'created_at', 'updated_at']
+
+    def validate_nom(self, value):
+        """Reject a name differing from another client's only by case, spacing or accents."""
+        duplicates = Client.objects.filter(nom_normalise=normalize_name(value)[:100])
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError("Un client avec ce nom existe déjà.")
+        return value
 
 
 class PartieSerializer(serializers.ModelSerializer):
@@ -41,15 +67,44 @@ class PartieSerializer(serializers.ModelSerializer):
 
     def get_duree(self, obj):
         """Calculate the duration of the partie."""
-        if obj.est_en_cours:
-            from django.utils import timezone
-            duration = timezone.now() - obj.date_debut
-        elif obj.date_fin:
-            duration = obj.date_fin - obj.date_debut
-        else:
-            return "0min"
-        
-        total_seconds = duration.total_seconds()
-        hours = int(total_seconds // 3600)
-        minutes = int((total_seconds % 3600) // 60)
-        return f"{hours}h {minutes}min"
+        return format_duree(obj.est_en_cours, obj.date_debut, obj.date_fin)
+
+
+class PartieListSerializer(serializers.Serializer):
+    """Read-only serializer for the flat ``values()`` rows of the parties list.
+
+    Renders the same payload as ``PartieSerializer`` without building model
+    instances or following the table/client relations per row.
+    """
+    LIST_FIELDS = ('id', 'table', 'table_nom', 'date_debut', 'date_fin', 'prix',
+                   'client', 'client_nom', 'est_en_cours', 'est_paye', 'next_player',
+                   'created_at', 'updated_at')
+
+    id = serializers.IntegerField()
+    table = serializers.IntegerField()
+    table_nom = serializers.CharField()
+    date_debut = serializers.DateTimeField()
+    date_fin = serializers.DateTimeField(allow_null=True)
+    prix = serializers.FloatField()
+    client = serializers.IntegerField(allow_null=True)
+    client_nom = serializers.CharField(allow_null=True)
+    est_en_cours = serializers.BooleanField()
+    est_paye = serializers.BooleanField()
+    next_player = serializers.CharField(allow_null=True)
+    duree = serializers.SerializerMethodField()
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField()
+
+    def get_duree(self, row):
+        """Calculate the duration of the partie."""
+        return format_duree(row['est_en_cours'], row['date_debut'], row['date_fin'])
+
+
+class FileAttenteSerializer(serializers.ModelSerializer):
+    """Serializer for FileAttente entries, with their estimated wait."""
+    attente_minutes = serializers.ReadOnlyField()
+
+    class Meta:
+        model = FileAttente
+        fields = ['id', 'table', 'nom', 'client', 'attente_minutes', 'created_at']
+        read_only_fields = ['id', 'table', 'client', 'created_at']
@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import versioning
+from .autocomplete import client_autocomplete
+from .models import Client, Parametres, Partie, Table
+
+
+@receiver(post_save, sender=Client)
+def client_saved(sender, instance, created, **kwargs):
+    """Evict autocomplete and name-lookup entries affected by a new or renamed client."""
+    previous = getattr(instance, '_nom_normalise_initial', None)
+    if created or previous != instance.nom_normalise:
+        client_autocomplete.invalidate(instance.nom_normalise, previous)
+    keys = {instance.nom_normalise, previous} - {None}
+    cache.delete_many([Client.cache_key(key) for key in keys])
+    instance._nom_normalise_initial = instance.nom_normalise
+
+
+@receiver(post_delete, sender=Client)
+def client_deleted(sender, instance, **kwargs):
+    client_autocomplete.invalidate(instance.nom_normalise)
+    cache.delete(Client.cache_key(instance.nom_normalise))
+
+
+@receiver(pre_delete, sender=Table)
+def table_deleting(sender, instance, **kwargs):
+    """Take the unpaid games a table delete cascades to out of their clients' balances."""
+    dues = Partie.objects.order_by()\
+        .filter(table=instance, est_en_cours=False, est_paye=False, client__isnull=False)\
+        .values('client').annotate(montant=Sum('prix'), parties=Count('id'))
+    Client.ajuster_soldes((due['client'], -due['montant'], -due['parties']) for due in dues)
+
+
+COLLECTIONS = {
+    Table: versioning.TABLES,
+    Client: versioning.CLIENTS,
+    Partie: versioning.PARTIES,
+    Parametres: versioning.PARAMETRES,
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_collection_version(sender, **kwargs):
+    """Invalidate the ETags of a collection when one of its rows changes."""
+    collection = COLLECTIONS.get(sender)
+    if collection:
+        # After commit, so no worker caches pre-commit data under the new version
+        transaction.on_commit(lambda: versioning.bump(collection))
@@ -0,0 +1,114 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from . import versioning
+from .models import Table, Partie, RevenueRollup
+
+# Safety net for writes that bump no version (raw SQL, shell); every API
+# write invalidates the cached stats at once through the versions
+STATS_CACHE_TIMEOUT = 30
+
+
+def start_of_today():
+    """Return midnight of the current local day as an aware datetime."""
+    return timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _partie_aggregates(today):
+    return dict(
+        unpaid_count=Count('id', filter=Q(est_paye=False)),
+        today_games=Count('id', filter=Q(date_debut__gte=today)),
+        active_parties_count=Count('id', filter=Q(est_en_cours=True)),
+    )
+
+
+def _table_aggregates():
+    return dict(
+        total=Count('id'),
+        available=Count('id', filter=Q(est_disponible=True)),
+    )
+
+
+def _hours_queryset(today):
+    # At most 24 rows: revenue per hour of day, all time and today
+    return RevenueRollup.objects.order_by().values('hour').annotate(
+        total=Sum('revenue'),
+        games=Sum('games'),
+        today=Sum('revenue', filter=Q(day=today.date())),
+    )
+
+
+def _build_stats(parties, tables, hours):
+    # Calculate peak hour (most profitable)
+    pic = max(hours, key=lambda row: row['total'], default=None)
+
+    return {
+        "total_money": float(sum(row['total'] for row in hours)),
+        # Finished games (archived ones included) come from the rollups
+        "total_games": sum(row['games'] for row in hours) + parties['active_parties_count'],
+        "peak_hour": pic['hour'] if pic else 0,
+        "unpaid_count": parties['unpaid_count'],
+        "today_revenue": float(sum(row['today'] or 0 for row in hours)),
+        "today_games": parties['today_games'],
+        "active_parties_count": parties['active_parties_count'],
+        "available_tables": f"{tables['available']}/{tables['total']}",
+    }
+
+
+def compute_dashboard_stats():
+    """Compute the dashboard metrics with conditional aggregation.
+
+    Every Partie counter comes out of a single aggregate query and table
+    availability out of a second one. Revenue figures, the finished games
+    count and the peak hour are read from the per-hour revenue rollups
+    rather than from raw sessions, so archived games are still counted.
+    """
+    today = start_of_today()
+    return _build_stats(
+        Partie.objects.aggregate(**_partie_aggregates(today)),
+        Table.objects.aggregate(**_table_aggregates()),
+        list(_hours_queryset(today)),
+    )
+
+
+async def acompute_dashboard_stats():
+    """Async version of ``compute_dashboard_stats`` using the async ORM."""
+    today = start_of_today()
+    return _build_stats(
+        await Partie.objects.aaggregate(**_partie_aggregates(today)),
+        await Table.objects.aaggregate(**_table_aggregates()),
+        [row async for row in _hours_queryset(today)],
+    )
+
+
+def stats_cache_key():
+    """Key of today's stats, for the current parties and tables versions.
+
+    The hall-local date starts a new entry at midnight, and any saved game
+    or table (``post_save`` and the bulk write paths bump the versions)
+    moves to a new key, so polls share one computation per change.
+    """
+    versions = versioning.get_versions(versioning.PARTIES, versioning.TABLES)
+    return 'manager:stats:{}:{}'.format(timezone.localdate().isoformat(), '.'.join(map(str, versions)))
+
+
+def get_dashboard_stats():
+    """``compute_dashboard_stats`` served from the cache when nothing changed."""
+    key = stats_cache_key()
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats()
+        cache.set(key, stats, timeout=STATS_CACHE_TIMEOUT)
+    return stats
+
+
+async def aget_dashboard_stats():
+    """Async version of ``get_dashboard_stats``."""
+    key = await sync_to_async(stats_cache_key)()
+    stats = await cache.aget(key)
+    if stats is None:
+        stats = await acompute_dashboard_stats()
+        await cache.aset(key, stats, timeout=STATS_CACHE_TIMEOUT)
+    return stats
@@ -0,0 +1,863 @@
+import csv
+import io
+import json
+import threading
+from datetime import date, timedelta
+from importlib import import_module
+from unittest import mock, skipUnless
+
+from django.apps import apps as django_apps
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, transaction
+from django.db.models import Sum
+from django.test import LiveServerTestCase, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.queries import QueryBudgetExceeded, query_budget
+from manager import events, versioning
+from manager.autocomplete import client_autocomplete
+from manager.benchmark import Benchmark
+from manager.models import Client, FileAttente, Parametres, Partie, PartieArchive, RevenueRollup, Table, tarifer
+from manager.utils import normalize_name
+from manager.importer import import_clients, import_parties
+from manager.loadtest import LoadTest
+from manager.views import PartieViewSet, TableViewSet, live_feed
+from manager.pricing import repricer
+from manager.reports import compute_report
+from manager.stats import stats_cache_key
+
+
+class PartieListQueriesTests(TestCase):
+    """The parties list costs the same number of queries whatever its size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.table = Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+        cls.client_ali = Client.objects.create(nom="Ali")
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+
+    def create_parties(self, count):
+        now = timezone.now()
+        Partie.objects.bulk_create([
+            Partie(table=self.table, client=self.client_ali if i % 2 else None,
+                   date_debut=now - timedelta(hours=i + 1), date_fin=now - timedelta(hours=i),
+                   est_en_cours=False, prix=1500, est_paye=i % 3 == 0)
+            for i in range(count)
+        ])
+
+    def assert_list_queries(self, count):
+        self.create_parties(count)
+        with self.assertNumQueries(1):
+            response = self.api.get('/api/manager/parties/', {'scope': 'all'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), min(count, 50))
+
+    def test_one_row(self):
+        self.assert_list_queries(1)
+
+    def test_many_rows(self):
+        self.assert_list_queries(120)
+
+    def test_until_covers_the_whole_day(self):
+        self.create_parties(1)
+        partie = Partie.objects.get()
+        jour = timezone.localdate(partie.date_debut)
+        for until, count in ((jour, 1), (jour - timedelta(days=1), 0)):
+            response = self.api.get('/api/manager/parties/', {'until': until.isoformat()})
+            self.assertEqual(len(response.json()['results']), count)
+
+
+class BulkActionQueriesTests(TestCase):
+    """Bulk stop and pay write rollups and balances in batch, not per game."""
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        Parametres.objects.create(id=1)
+        Parametres.get_cached()
+
+    def count_queries(self, size):
+        tables = [Table.objects.create(numero=size * 100 + i, nom=f"Table {i}", prix_heure=10) for i in range(size)]
+        for table in tables:
+            Partie.demarrer(table.id, client=Client.objects.create(nom=f"Joueur {size} {table.numero}"))
+        with CaptureQueriesContext(connection) as stop:
+            self.api.post('/api/manager/parties/bulk_stop/', {'tables': [t.id for t in tables]}, format='json')
+        ids = list(Partie.objects.filter(table__in=tables).values_list('id', flat=True))
+        with CaptureQueriesContext(connection) as pay:
+            response = self.api.post('/api/manager/parties/bulk_pay/', {'ids': ids}, format='json')
+        self.assertEqual([r['status'] for r in response.json()['results']], ['paid'] * size)
+        return len(stop), len(pay)
+
+    def test_constant_queries(self):
+        self.assertEqual(self.count_queries(2), self.count_queries(10))
+        self.assertFalse(Client.objects.filter(parties_impayees__gt=0).exists())
+        self.assertEqual(RevenueRollup.objects.aggregate(games=Sum('games'))['games'], 12)
+
+    def test_record_many_keeps_every_delta(self):
+        tables = [Table.objects.create(numero=i, nom=f"Table {i}", prix_heure=10) for i in range(3)]
+        parties = [Partie.demarrer(table.id) for table in tables]
+        for partie in parties:
+            partie.stop_partie()
+        # Two buckets already exist, the third is missing
+        RevenueRollup.objects.filter(table=tables[1]).delete()
+        RevenueRollup.objects.update(revenue=100, games=1)
+
+        RevenueRollup.record_many((partie, {'revenue': 10, 'games': 1}) for partie in parties)
+
+        self.assertEqual(
+            list(RevenueRollup.objects.order_by('table__numero').values_list('table__numero', 'revenue', 'games')),
+            [(0, 110, 2), (1, 10, 1), (2, 110, 2)],
+        )
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        table = Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+        fin = timezone.now()
+        Partie.objects.create(table=table, client=Client.objects.create(nom="Ali"),
+                              date_debut=fin - timedelta(minutes=31, microseconds=1234), date_fin=fin,
+                              est_en_cours=False, prix=1500, est_paye=True)
+
+    def export(self, query):
+        response = self.client.get('/api/manager/parties/export/' + query)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_formats_share_timestamps(self):
+        response, body = self.export('?format=csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        row = next(csv.DictReader(io.StringIO(body)))
+        response, body = self.export('?format=ndjson')
+        line = json.loads(body.splitlines()[0])
+        for column in ('date_debut', 'date_fin'):
+            self.assertEqual(row[column], line[column])
+        self.assertEqual(row['date_debut'], Partie.objects.get().date_debut.isoformat())
+
+    def test_errors_are_json(self):
+        for query, status in (('?since=bad', 400), ('?format=xml', 404)):
+            response = self.client.get('/api/manager/parties/export/' + query)
+            self.assertEqual(response.status_code, status)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertFalse(response.json()['success'])
+
+    def test_includes_archived_games(self):
+        table = Table.objects.get()
+        debut = timezone.now() - timedelta(days=120)
+        impayee, archivee = (
+            Partie.objects.create(table=table, client=Client.objects.get(), date_debut=debut + offset,
+                                  date_fin=debut + offset + timedelta(hours=1),
+                                  est_en_cours=False, prix=1000, est_paye=paye)
+            for offset, paye in ((timedelta(0), False), (timedelta(days=10), True))
+        )
+        recente = Partie.objects.latest('date_debut')
+        call_command('archive_parties', older_than=90, stdout=io.StringIO())
+        self.assertFalse(Partie.objects.filter(pk=archivee.pk).exists())
+
+        for query, expected in (
+            ('', [impayee, archivee, recente]),
+            ('&paye=true&nom=ali', [archivee, recente]),
+            ('&paye=false', [impayee]),
+            (f'&until={timezone.localdate(archivee.date_debut)}', [impayee, archivee]),
+        ):
+            with self.subTest(query=query):
+                _, body = self.export('?format=csv' + query)
+                rows = list(csv.DictReader(io.StringIO(body)))
+                self.assertEqual([int(row['id']) for row in rows], [partie.pk for partie in expected])
+                self.assertEqual([row['paye'] for row in rows], [str(partie.est_paye) for partie in expected])
+
+
+class ClientBalanceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+
+    def test_table_delete_settles_balances(self):
+        table = Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+        other = Table.objects.create(numero=2, nom="Table 2", prix_heure=10)
+        for played_on in (table, table, other):
+            Partie.demarrer(played_on.id).stop_partie("Ali")
+        ali = Client.objects.get(nom="Ali")
+        self.assertEqual(ali.parties_impayees, 3)
+
+        response = self.api.delete(f'/api/manager/tables/{table.id}/')
+
+        self.assertEqual(response.status_code, 204)
+        ali.refresh_from_db()
+        self.assertEqual((ali.solde_du, ali.parties_impayees), (Partie.objects.get().prix, 1))
+
+
+class ClientNameCacheTests(TransactionTestCase):
+    """Name resolutions cached by ``Client.par_nom`` never outlive their client."""
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        self.table = Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+
+    def cached(self, nom):
+        return cache.get(Client.cache_key(normalize_name(nom)))
+
+    def test_rolled_back_creation_is_not_cached(self):
+        with self.assertRaises(ZeroDivisionError):
+            with transaction.atomic():
+                Client.par_nom("Benchmark 0")
+                1 / 0
+        self.assertIsNone(self.cached("Benchmark 0"))
+
+        client = Client.par_nom("Benchmark 0")
+        self.assertEqual(self.cached("Benchmark 0"), (client.pk, "Benchmark 0"))
+
+    def test_stop_recovers_from_a_dangling_id(self):
+        cache.set(Client.cache_key(normalize_name("Fantome")), (987654, "Fantome"))
+        partie = Partie.demarrer(self.table.id)
+
+        response = self.api.post(f'/api/manager/parties/{partie.id}/stop/', {'loser_name': "Fantome"}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        client = Client.objects.get(nom_normalise="fantome")
+        self.assertEqual(response.json()['client'], client.pk)
+        self.assertEqual(self.cached("Fantome"), (client.pk, "Fantome"))
+        self.assertFalse(Partie.objects.get(pk=partie.pk).est_en_cours)
+
+
+class RepricingTests(TestCase):
+    """The SQL re-pricing gives the prices ``tarifer`` gives live games."""
+
+    def test_matches_tarifer(self):
+        table = Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+        config = Parametres.objects.create(id=1)
+        fin = timezone.now().replace(microsecond=0)
+        # 17.5 and 18.5 minutes land exactly on a half millime
+        durees = [5, 10, 17.5, 18.5, 31.3, 45.1, 90.7, 200 / 3, 240]
+        parties = Partie.objects.bulk_create([
+            Partie(table=table, date_debut=fin - timedelta(minutes=duree), date_fin=fin,
+                   est_en_cours=False, prix=0, est_paye=True)
+            for duree in durees
+        ])
+
+        repricer(Partie.objects.all(), config)
+
+        for partie in Partie.objects.filter(id__in=[partie.id for partie in parties]):
+            attendu = tarifer(partie.duree_minutes, config.tarif_base, config.tarif_reduit, config.seuil_prix)
+            self.assertEqual(partie.prix, attendu, partie.duree_minutes)
+
+
+@skipUnless(connection.vendor == 'postgresql', "Plans and indexes are PostgreSQL-specific")
+class PartieIndexTests(TestCase):
+    """Each hot filter is served by the index added for it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.table = Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+        cls.client_ali = Client.objects.create(nom="Ali Ben Salah")
+        Client.objects.bulk_create([Client(nom=f"Client {i}", nom_normalise=f"client {i}") for i in range(200)])
+        now = timezone.now()
+        Partie.objects.bulk_create([
+            Partie(table=cls.table, client=cls.client_ali, date_debut=now - timedelta(hours=i + 1),
+                   date_fin=now - timedelta(hours=i), est_en_cours=False, prix=1500, est_paye=i % 10 != 0)
+            for i in range(500)
+        ])
+        Partie.objects.create(table=cls.table, date_debut=now, est_en_cours=True)
+
+    def assertUsesIndex(self, queryset, index_name):
+        # The test tables are tiny: make sequential scans unattractive so the
+        # plan shows whether a matching index exists at all.
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_active_parties(self):
+        self.assertUsesIndex(Partie.objects.filter(table=self.table, est_en_cours=True), 'partie_active_idx')
+
+    def test_unpaid_parties(self):
+        self.assertUsesIndex(Partie.objects.filter(client=self.client_ali, est_paye=False), 'partie_unpaid_idx')
+
+    def test_list_ordering(self):
+        queryset = Partie.objects.filter(date_debut__gte=timezone.now() - timedelta(days=1))\
+            .order_by('-date_debut', 'id')[:50]
+        self.assertUsesIndex(queryset, 'partie_date_debut_id_idx')
+
+    def test_client_name_search(self):
+        self.assertUsesIndex(Client.objects.filter(nom__icontains='salah'), 'client_nom_trgm_idx')
+
+    def test_autocomplete_word_start(self):
+        self.assertUsesIndex(client_autocomplete._word_matches('sal').order_by(), 'client_nom_normalise_trgm_idx')
+
+
+@skipUnless(connection.vendor == 'postgresql', "Needs row-level locking between connections")
+class GameTransitionConcurrencyTests(TransactionTestCase):
+    """Concurrent starts and stops on one table never double-book it."""
+    THREADS = 12
+
+    def setUp(self):
+        cache.clear()
+        self.table = Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+
+    def run_concurrently(self, func):
+        """Run ``func`` in ``THREADS`` threads released together; return the results."""
+        barrier = threading.Barrier(self.THREADS)
+        results, errors = [], []
+
+        def worker(index):
+            try:
+                barrier.wait()
+                results.append(func(index))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return results
+
+    def test_concurrent_starts(self):
+        results = self.run_concurrently(lambda index: Partie.demarrer(self.table.id))
+
+        self.assertEqual(sum(partie is not None for partie in results), 1)
+        self.assertEqual(Partie.objects.filter(table=self.table, est_en_cours=True).count(), 1)
+        self.table.refresh_from_db()
+        self.assertFalse(self.table.est_disponible)
+
+    def test_concurrent_stops(self):
+        partie = Partie.demarrer(self.table.id)
+        results = self.run_concurrently(
+            lambda index: Partie.objects.get(pk=partie.pk).stop_partie(f"Joueur {index % 3}")
+        )
+
+        self.assertEqual(results.count(True), 1)
+        partie.refresh_from_db()
+        self.assertFalse(partie.est_en_cours)
+        self.assertEqual(RevenueRollup.objects.aggregate(games=Sum('games'))['games'], 1)
+        self.assertEqual(Client.objects.aggregate(parties=Sum('parties_impayees'))['parties'], 1)
+        self.table.refresh_from_db()
+        self.assertTrue(self.table.est_disponible)
+
+    def test_start_stop_race(self):
+        def play(index):
+            started = 0
+            for _ in range(10):
+                partie = Partie.demarrer(self.table.id)
+                if partie is not None:
+                    started += 1
+                    # While this thread holds the table, its game is the only active one
+                    actives.append(Partie.objects.filter(table=self.table, est_en_cours=True).count())
+                    partie.stop_partie(f"Joueur {index % 3}")
+            return started
+
+        actives = []
+        started = sum(self.run_concurrently(play))
+
+        self.assertEqual(set(actives), {1})
+        self.assertEqual(Partie.objects.filter(table=self.table).count(), started)
+        self.assertFalse(Partie.objects.filter(table=self.table, est_en_cours=True).exists())
+        self.assertEqual(RevenueRollup.objects.aggregate(games=Sum('games'))['games'], started)
+        self.table.refresh_from_db()
+        self.assertTrue(self.table.est_disponible)
+
+
+@override_settings(QUERY_BUDGETS='raise')
+class QueryBudgetTests(TransactionTestCase):
+    """Every API action stays within its query budget on a busy hall.
+
+    Requests run with ``QUERY_BUDGETS='raise'``, so an action going over its
+    budget fails with ``QueryBudgetExceeded``. Caches start cold, and there
+    is no wrapping transaction, so atomic blocks cost what they do in
+    production rather than two extra savepoint queries.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        self.tables = [Table.objects.create(numero=i, nom=f"Table {i}", prix_heure=10) for i in range(1, 5)]
+        for nom in ("Ali", "Sami", "Yanis"):
+            for table in self.tables[2:]:
+                Partie.demarrer(table.id).stop_partie(nom)
+        self.active = [Partie.demarrer(table.id, next_player="Karim") for table in self.tables[:2]]
+        for table in self.tables[:2]:
+            for nom in ("Karim", "Nadia", "Ali"):
+                FileAttente.ajouter(table.id, nom)
+        self.unpaid = list(Partie.objects.filter(est_paye=False, est_en_cours=False))
+        self.ali = Client.objects.get(nom="Ali")
+        cache.clear()
+
+    def call(self, method, url, data=None, status=200):
+        response = getattr(self.api, method)(f'/api/manager/{url}', data, format='json')
+        self.assertEqual(response.status_code, status, getattr(response, 'data', None))
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def test_tables(self):
+        table, free = self.tables[0], self.tables[3]
+        self.call('get', 'tables/')
+        self.call('get', 'tables/?disponible=true')
+        self.call('post', 'tables/', {'numero': 9, 'nom': "Table 9", 'prix_heure': 12}, status=201)
+        self.call('get', f'tables/{table.id}/')
+        self.call('put', f'tables/{free.id}/', {'numero': free.numero, 'nom': "Billard", 'prix_heure': 15})
+        self.call('patch', f'tables/{free.id}/', {'prix_heure': 20})
+        self.call('get', f'tables/{table.id}/queue/')
+        self.call('post', f'tables/{table.id}/queue/', {'nom': "Lina"}, status=201)
+        self.call('post', f'tables/{table.id}/dequeue/')
+        self.call('delete', f'tables/{self.tables[2].id}/', status=204)
+
+    def test_clients(self):
+        self.call('get', 'clients/')
+        self.call('get', 'clients/?search=a')
+        self.call('post', 'clients/', {'nom': "Lina"}, status=201)
+        self.call('get', f'clients/{self.ali.id}/')
+        self.call('put', f'clients/{self.ali.id}/', {'nom': "Ali", 'telephone': "0550000000"})
+        self.call('patch', f'clients/{self.ali.id}/', {'email': "ali@example.com"})
+        self.call('get', 'clients/top_debtors/')
+        self.call('delete', f'clients/{self.ali.id}/', status=204)
+
+    def test_parties_reads(self):
+        partie = self.unpaid[0]
+        self.call('get', 'parties/')
+        self.call('get', 'parties/?scope=all')
+        self.call('get', 'parties/?paye=false&nom=ali')
+        self.call('get', f'parties/{partie.id}/')
+        self.call('get', 'parties/get_stats/')
+        self.call('get', 'parties/search_client/?q=al')
+        self.call('get', 'parties/report/?par_table=true')
+        self.call('get', 'parties/export/?format=ndjson')
+
+    def test_parties_writes(self):
+        partie, active = self.unpaid[0], self.active[0]
+        self.call('post', 'parties/', {'table': self.tables[3].id, 'next_player': "Lina"}, status=201)
+        self.call('patch', f'parties/{partie.id}/', {'prix': 2000})
+        data = self.call('get', f'parties/{partie.id}/').data
+        self.call('put', f'parties/{partie.id}/', {**data, 'client': Client.objects.get(nom="Sami").id})
+        self.call('post', f'parties/{active.id}/set_next_player/', {'next_player': "Lina"}, status=201)
+        self.call('post', f'parties/{active.id}/pay/')
+        self.call('post', f'parties/{partie.id}/pay/')
+        self.call('post', 'parties/bulk_pay/', {'ids': [p.id for p in self.unpaid[1:]]})
+        self.call('post', 'parties/bulk_next_player/', {'next_players': {str(self.active[1].id): "Nadia"}})
+        self.call('delete', f'parties/{self.unpaid[1].id}/', status=204)
+
+    def test_parties_stop(self):
+        first, second = self.active
+        # A new loser, and the next player in the queue starts a game at once
+        response = self.call('post', f'parties/{first.id}/stop/', {'loser_name': "Lina"})
+        self.assertIn('next_partie', response.data)
+        self.call('post', f'parties/{second.id}/stop/', {'loser_name': "Nouveau", 'auto_start': False})
+        self.call('post', 'parties/bulk_stop/', {'tables': [table.id for table in self.tables]})
+
+    def test_config(self):
+        self.call('get', 'config/')
+        self.call('post', 'config/', {'tarif_base': 500})
+
+    def test_exceeding_the_budget_fails(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(1):
+                list(Table.objects.all())
+                list(Client.objects.all())
+        with mock.patch.dict(TableViewSet.query_budgets, {'queue': 1}):
+            with self.assertRaises(QueryBudgetExceeded), self.assertLogs('django.request', 'ERROR'):
+                self.call('get', f'tables/{self.tables[0].id}/queue/')
+
+
+class ReportTests(TestCase):
+    """Reports bucket the hourly rollups by day, ISO week or month."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.table = Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+        # Friday 30 January, then Monday 2 and Tuesday 3 February 2026
+        for day, hour, revenue in ((date(2026, 1, 30), 20, 1000), (date(2026, 2, 2), 18, 500),
+                                   (date(2026, 2, 2), 19, 700), (date(2026, 2, 3), 21, 300)):
+            RevenueRollup.objects.create(day=day, hour=hour, table=cls.table,
+                                         revenue=revenue, paid=revenue, games=1, minutes=30)
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+
+    def report(self, **params):
+        params = {'since': '2026-01-30', 'until': '2026-02-10', **params}
+        return self.api.get('/api/manager/parties/report/', params)
+
+    def periods(self, granularity):
+        response = self.report(granularity=granularity)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['totals']['revenue'], 2500)
+        return [(str(period['periode']), period['days'], period['revenue']) for period in response.data['periods']]
+
+    def test_day(self):
+        periods = self.periods('day')
+        self.assertEqual(len(periods), 12)
+        self.assertEqual(periods[:5], [('2026-01-30', 1, 1000), ('2026-01-31', 1, 0), ('2026-02-01', 1, 0),
+                                       ('2026-02-02', 1, 1200), ('2026-02-03', 1, 300)])
+
+    def test_week(self):
+        # ISO weeks start on Monday; the partial first and last weeks only count their days in range
+        self.assertEqual(self.periods('week'), [('2026-01-26', 3, 1000), ('2026-02-02', 7, 1500),
+                                                ('2026-02-09', 2, 0)])
+
+    def test_month(self):
+        self.assertEqual(self.periods('month'), [('2026-01-01', 2, 1000), ('2026-02-01', 10, 1500)])
+
+    def test_per_table(self):
+        response = self.report(granularity='month', par_table='true')
+        self.assertEqual([table['revenue'] for table in response.data['totals']['tables']], [2500])
+
+    def test_invalid_ranges(self):
+        for params in ({'since': '2026-02-11'}, {'granularity': 'year'},
+                       {'since': '2020-01-01', 'granularity': 'day'}, {'until': 'demain'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.report(**params).status_code, 400)
+
+    def test_cache_invalidated_by_writes(self):
+        today = timezone.localdate()
+        self.assertEqual(compute_report(today, today)['totals']['games'], 0)
+        with self.assertNumQueries(0):
+            compute_report(today, today)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Partie.demarrer(self.table.id).stop_partie("Ali")
+        self.assertEqual(compute_report(today, today)['totals']['games'], 1)
+
+
+class ETagTests(TestCase):
+    """Polled collections answer 304 until one of their rows changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.table = Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        # The parties tag changes every minute; keep the clock still
+        patcher = mock.patch('django.utils.timezone.now', return_value=timezone.now())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assert_etag_cycle(self, url, write):
+        etag = self.api.get(url)['ETag']
+        response = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+        response = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_tables(self):
+        self.assert_etag_cycle('/api/manager/tables/', lambda: self.api.patch(
+            f'/api/manager/tables/{self.table.id}/', {'nom': "Billard"}, format='json'))
+
+    def test_parties(self):
+        self.assert_etag_cycle('/api/manager/parties/', lambda: self.api.post(
+            '/api/manager/parties/', {'table': self.table.id}, format='json'))
+
+    def test_parties_follow_client_renames(self):
+        partie = Partie.demarrer(self.table.id)
+        partie.stop_partie("Ali")
+        client = Client.objects.get(nom="Ali")
+        self.assert_etag_cycle('/api/manager/parties/?scope=all', lambda: self.api.patch(
+            f'/api/manager/clients/{client.id}/', {'nom': "Ali B."}, format='json'))
+
+    def test_config(self):
+        self.assert_etag_cycle('/api/manager/config/', lambda: self.api.post(
+            '/api/manager/config/', {'tarif_base': 500}, format='json'))
+
+
+class AutocompleteTests(TestCase):
+    """Client autocomplete ranking, accent folding and cache eviction."""
+
+    def setUp(self):
+        client_autocomplete.clear()
+        for nom in ("Salah Eddine", "Ben Salah", "Sal", "Salima", "Élodie Sàlem", "Karim"):
+            Client.objects.create(nom=nom)
+
+    def search(self, query):
+        return [client['nom'] for client in client_autocomplete.search(query)]
+
+    def test_prefix_ranking(self):
+        # Exact name, then prefixes by length, then names with a later word matching
+        self.assertEqual(self.search("sal"), ["Sal", "Salima", "Salah Eddine", "Ben Salah", "Élodie Sàlem"])
+        self.assertEqual(self.search("SALA"), ["Salah Eddine", "Ben Salah"])
+
+    def test_accents_are_folded(self):
+        self.assertEqual(self.search("elo"), ["Élodie Sàlem"])
+        self.assertEqual(self.search("  ÉLO "), ["Élodie Sàlem"])
+
+    def test_only_names_are_cached(self):
+        ali = Client.objects.create(nom="Ali")
+        self.assertEqual(client_autocomplete.search("ali"), [{'id': ali.id, 'nom': "Ali"}])
+
+    def test_rename_evicts(self):
+        self.assertEqual(self.search("kar"), ["Karim"])
+        self.assertEqual(self.search("nad"), [])
+        client = Client.objects.get(nom="Karim")
+        client.nom = "Nadir Karim"
+        client.save()
+        self.assertEqual(self.search("nad"), ["Nadir Karim"])
+        self.assertEqual(self.search("kar"), ["Nadir Karim"])
+
+    def test_create_and_delete_evict(self):
+        self.assertEqual(self.search("sali"), ["Salima"])
+        Client.objects.create(nom="Salim")
+        self.assertEqual(self.search("sali"), ["Salim", "Salima"])
+        Client.objects.get(nom="Salima").delete()
+        self.assertEqual(self.search("sali"), ["Salim"])
+
+    def test_lru_is_bounded(self):
+        autocomplete = type(client_autocomplete)(max_entries=2)
+        for query in ("sal", "kar", "elo"):
+            autocomplete.search(query)
+        self.assertEqual(list(autocomplete._entries), ["kar", "elo"])
+
+
+class WaitingQueueTests(TestCase):
+    """Stopping a game starts the next one for the head of the table's queue."""
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        self.table = Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+        self.partie = Partie.demarrer(self.table.id)
+        for nom in ("Karim", "Nadia"):
+            self.api.post(f'/api/manager/tables/{self.table.id}/queue/', {'nom': nom}, format='json')
+
+    def stop(self, partie, **data):
+        response = self.api.post(f'/api/manager/parties/{partie.id}/stop/', data, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_queued_player_is_not_billed(self):
+        data = self.stop(self.partie, loser_name="Ali")
+        suivante = Partie.objects.get(pk=data['next_partie']['id'])
+        self.assertEqual((suivante.client, suivante.next_player), (None, "Karim"))
+        self.assertEqual(list(FileAttente.objects.values_list('nom', flat=True)), ["Nadia"])
+        # Queued names never become clients on their own
+        self.assertFalse(Client.objects.filter(nom__in=["Karim", "Nadia"]).exists())
+
+        self.stop(suivante)
+        suivante.refresh_from_db()
+        self.assertIsNone(suivante.client)
+        self.assertEqual(list(Client.objects.filter(solde_du__gt=0).values_list('nom', flat=True)), ["Ali"])
+
+    def test_auto_start_can_be_disabled(self):
+        data = self.stop(self.partie, auto_start=False)
+        self.assertNotIn('next_partie', data)
+        self.assertEqual(FileAttente.objects.count(), 2)
+
+
+class RollupBackfillTests(TestCase):
+    """Migrating to the rollups fills them from the games already played."""
+
+    def test_backfill_matches_live_recording(self):
+        fill_rollups = import_module('manager.migrations.0005_revenuerollup').fill_rollups
+        tables = [Table.objects.create(numero=i, nom=f"Table {i}", prix_heure=10) for i in range(2)]
+        debut = timezone.now() - timedelta(days=2)
+        for i, (prix, paye) in enumerate(((1000, True), (500, False), (700, True))):
+            Partie.objects.create(table=tables[i % 2], date_debut=debut - timedelta(hours=i),
+                                  date_fin=debut - timedelta(hours=i) + timedelta(minutes=30),
+                                  est_en_cours=False, prix=prix, est_paye=paye)
+            RevenueRollup.apply(Partie.objects.latest('id'))
+        Partie.demarrer(tables[0].id)
+        fields = ('day', 'hour', 'table_id', 'revenue', 'paid', 'games', 'minutes')
+        recorded = list(RevenueRollup.objects.order_by('day', 'hour').values_list(*fields))
+
+        RevenueRollup.objects.all().delete()
+        fill_rollups(django_apps, None)
+
+        self.assertEqual(list(RevenueRollup.objects.order_by('day', 'hour').values_list(*fields)), recorded)
+        self.assertEqual(len(recorded), 3)
+
+
+class ArchiveTests(TestCase):
+    """archive_parties moves settled games in batches without losing any."""
+
+    def setUp(self):
+        self.table = Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+        fin = timezone.now() - timedelta(days=100)
+        self.parties = [
+            Partie.objects.create(table=self.table, date_debut=fin - timedelta(hours=1, minutes=i), date_fin=fin,
+                                  est_en_cours=False, prix=1000, est_paye=i != 4)
+            for i in range(5)
+        ]
+
+    def test_batches_bump_versions_once(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            total = PartieArchive.archiver(timezone.now() - timedelta(days=90), batch_size=2)
+        self.assertEqual(total, 4)
+        # Two batches, one version bump each
+        self.assertEqual(len(callbacks), 2)
+        self.assertEqual(list(Partie.objects.values_list('id', flat=True)), [self.parties[4].id])
+        self.assertEqual(PartieArchive.objects.count(), 4)
+
+    def test_conflicting_id_keeps_the_game(self):
+        partie = self.parties[0]
+        PartieArchive.objects.create(**{field: getattr(partie, field) for field in PartieArchive.CHAMPS})
+        with self.assertRaises(CommandError):
+            call_command('archive_parties', older_than=90, stdout=io.StringIO())
+        self.assertTrue(Partie.objects.filter(pk=partie.pk).exists())
+        self.assertEqual(Partie.objects.count(), 5)
+
+
+class ImportTests(TestCase):
+    """CSV imports round-trip the export and can be replayed safely."""
+
+    def setUp(self):
+        cache.clear()
+        self.table = Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+        debut = timezone.now() - timedelta(days=3)
+        for i, (nom, paye) in enumerate((("Ali", True), ("Sami", False), (None, False))):
+            Partie.demarrer(self.table.id)
+            partie = Partie.objects.get(est_en_cours=True)
+            Partie.objects.filter(pk=partie.pk).update(date_debut=debut + timedelta(hours=i))
+            partie.refresh_from_db()
+            partie.stop_partie(nom)
+            if paye:
+                partie.payer()
+
+    def export(self):
+        response = self.client.get('/api/manager/parties/export/')
+        return b''.join(response.streaming_content).decode()
+
+    def state(self):
+        return (
+            list(Partie.objects.order_by('date_debut').values_list(
+                'table__numero', 'client__nom', 'date_debut', 'date_fin', 'prix', 'est_paye')),
+            list(Client.objects.order_by('nom').values_list('nom', 'solde_du', 'parties_impayees')),
+            RevenueRollup.objects.aggregate(revenue=Sum('revenue'), paid=Sum('paid'), games=Sum('games')),
+        )
+
+    def test_round_trip(self):
+        body, before = self.export(), self.state()
+        for partie in Partie.objects.all():
+            PartieViewSet().perform_destroy(partie)
+
+        report = import_parties(io.StringIO(body))
+
+        self.assertEqual((report.created, report.existing, report.skipped), (3, 0, 0))
+        self.assertEqual(self.state(), before)
+
+    def test_reimport_is_a_no_op(self):
+        body, before = self.export(), self.state()
+        report = import_parties(io.StringIO(body))
+        self.assertEqual((report.created, report.existing), (0, 3))
+        self.assertEqual(self.state(), before)
+
+    def test_foreign_ids_are_new_games(self):
+        # Same id as a local game, but another start: a game of another hall
+        row = next(csv.DictReader(io.StringIO(self.export())))
+        body = f"id,table,date_debut,date_fin\n{row['id']},1,2025-05-01T20:00:00,2025-05-01T21:00:00\n"
+        report = import_parties(io.StringIO(body))
+        self.assertEqual((report.created, report.existing), (1, 0))
+
+    def test_bad_rows(self):
+        body = (
+            "id,table,client,date_debut,date_fin,prix,paye\n"
+            "x,1,Ali,2025-05-01T20:00:00,2025-05-01T21:00:00,1500,1\n"
+            ",9,Ali,2025-05-01T20:00:00,2025-05-01T21:00:00,1500,1\n"
+            ",1,Ali,hier,2025-05-01T21:00:00,1500,1\n"
+            ",1,Ali,2025-05-01T20:00:00,2025-05-01T19:00:00,1500,1\n"
+            ",1,Ali,2025-05-01T20:00:00,2025-05-01T21:00:00,abc,1\n"
+            ",1,Nadia,2025-05-01T20:00:00,2025-05-01T21:00:00,,0\n"
+        )
+        report = import_parties(io.StringIO(body))
+        self.assertEqual((report.rows, report.created, report.skipped), (6, 1, 5))
+        self.assertEqual([error['ligne'] for error in report.errors], [2, 3, 4, 5, 6])
+        nadia = Client.objects.get(nom="Nadia")
+        self.assertEqual((nadia.parties_impayees, nadia.solde_du), (1, Partie.objects.get(client=nadia).prix))
+
+    def test_clients(self):
+        body = "nom,telephone,email\nLina,0550,\n LINA ,,\n,0551,\nAli,,ali@example.com\n"
+        report = import_clients(io.StringIO(body))
+        self.assertEqual((report.rows, report.created, report.skipped), (4, 1, 1))
+        self.assertEqual(Client.objects.get(nom="Lina").telephone, "0550")
+        self.assertEqual(import_clients(io.StringIO(body)).created, 0)
+
+    def test_clients_created_concurrently(self):
+        # Another import creates "Lina" after this one looked the names up
+        with mock.patch('manager.importer.known_names', return_value=set()):
+            report = import_clients(io.StringIO("nom\nLina\nAli\nKarim\n"), batch_size=10)
+        self.assertEqual(report.created, 2)
+        self.assertEqual([error['ligne'] for error in report.errors], [3])
+        self.assertEqual(Client.objects.filter(nom__in=["Lina", "Karim"]).count(), 2)
+
+
+class LiveFeedTests(TestCase):
+    """Live feed connections end and their events always fit in a NOTIFY."""
+
+    async def test_stream_closes_and_unsubscribes_at_max_age(self):
+        response = await live_feed(RequestFactory().get('/api/manager/live/'))
+        with mock.patch('manager.views.LIVE_FEED_MAX_AGE', 0.05):
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(chunks[0], b'retry: 3000\n\n')
+        self.assertEqual(events.broker._subscribers, set())
+
+    def test_queue_event_size_does_not_grow_with_the_queue(self):
+        queue = [{'id': i, 'nom': "Joueur %d" % i, 'position': i} for i in range(1000)]
+        with mock.patch.object(events.broker, 'dispatch') as dispatch:
+            with self.captureOnCommitCallbacks(execute=True):
+                events.publish_queue(1, queue)
+        payload = json.loads(dispatch.call_args.args[0])
+        self.assertEqual(payload, {'type': events.QUEUE_UPDATED, 'data': {'table': 1, 'size': 1000}})
+
+    def test_oversized_event_is_dropped(self):
+        with mock.patch.object(events.broker, 'dispatch') as dispatch:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                events.publish(events.TABLE_UPDATED, {'nom': 'x' * events.NOTIFY_MAX_BYTES})
+        self.assertEqual(callbacks, [])
+        dispatch.assert_not_called()
+
+
+class BenchmarkTests(TestCase):
+    """The benchmark leaves neither rows nor cache entries behind."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+        Client.objects.create(nom="Ali")
+
+    def test_run_leaves_the_shared_cache_untouched(self):
+        cache.clear()
+        results = Benchmark(iterations=1, warmup=0).run()
+
+        self.assertEqual(results['results']['get_stats']['runs'], 1)
+        self.assertEqual(Partie.objects.count(), 0)
+        self.assertEqual(Table.objects.count(), 1)
+        self.assertIsNone(cache.get(stats_cache_key()))
+        version, = versioning.get_versions(versioning.PARAMETRES)
+        self.assertIsNone(cache.get(f'manager:parametres:{version}'))
+        self.assertIsNone(Parametres._cached)
+
+
+class LoadTestTests(LiveServerTestCase):
+    """The load test counts the requests a real server answered."""
+
+    def setUp(self):
+        cache.clear()
+        Table.objects.create(numero=1, nom="Table 1", prix_heure=10)
+
+    def test_reports_requests_per_endpoint(self):
+        paths = ('/api/manager/tables/', '/api/manager/nope/')
+        with self.assertLogs('django.request', 'WARNING'):
+            results = LoadTest(self.live_server_url, paths=paths, concurrency=1, duration=0.2).run(label="test")
+
+        tables, missing = results['results']['/api/manager/tables/'], results['results']['/api/manager/nope/']
+        self.assertEqual(results['label'], "test")
+        self.assertGreater(tables['requests'], 0)
+        self.assertEqual(tables['errors'], 0)
+        self.assertGreater(tables['rps'], 0)
+        self.assertEqual(missing['requests'], 0)
+        self.assertGreater(missing['errors'], 0)
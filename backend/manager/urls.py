@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TableViewSet, ClientViewSet, PartieViewSet, ParametresViewSet
+from .views import TableViewSet, ClientViewSet, PartieViewSet, ParametresViewSet, live_feed
+from .async_views import async_read, tables_list, parties_list, get_stats, search_client
 
 router = DefaultRouter()
 router.register(r'tables', TableViewSet, basename='table')
@@ -9,5 +10,15 @@ router.register(r'parties', PartieViewSet, basename='partie')
 router.register(r'config', ParametresViewSet, basename='config')
 
 urlpatterns = [
+    path('live/', live_feed, name='live-feed'),
+    # Async GET handlers in front of the router; other methods reach the viewsets
+    path('tables/', async_read(tables_list, TableViewSet.as_view({'get': 'list', 'post': 'create'})),
+         name='table-list'),
+    path('parties/', async_read(parties_list, PartieViewSet.as_view({'get': 'list', 'post': 'create'})),
+         name='partie-list'),
+    path('parties/get_stats/', async_read(get_stats, PartieViewSet.as_view({'get': 'get_stats'})),
+         name='partie-get-stats'),
+    path('parties/search_client/', async_read(search_client, PartieViewSet.as_view({'get': 'search_client'})),
+         name='partie-search-client'),
     path('', include(router.urls)),
 ]
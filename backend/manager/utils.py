@@ -0,0 +1,11 @@
+import unicodedata
+
+
+def normalize_name(value):
+    """Fold a client name for matching: accents, case and spacing are ignored.
+
+    ``"  Éric  BEN Ali "`` becomes ``"eric ben ali"``.
+    """
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    folded = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(folded.casefold().split())
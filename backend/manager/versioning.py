@@ -0,0 +1,63 @@
+"""Change versions of the manager collections, used to build ETags.
+
+Each collection has a counter in the Django cache that is bumped whenever
+one of its rows is saved or deleted. A list response is identified by the
+versions it was built from, so an unchanged poll is answered with a 304
+after a single cache lookup. Deployments running several workers must use
+a shared cache backend (``REDIS_URL``) for the counters to agree.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+
+TABLES = 'table'
+CLIENTS = 'client'
+PARTIES = 'partie'
+PARAMETRES = 'parametres'
+
+KEY_PREFIX = 'manager:version:'
+
+
+def _seed():
+    # Counters start from the clock so a cache flush never makes an old
+    # version number, and therefore an old ETag, valid again.
+    return int(time.time() * 1000)
+
+
+def bump(*collections):
+    """Mark the given collections as changed."""
+    for collection in collections:
+        key = KEY_PREFIX + collection
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _seed(), timeout=None)
+
+
+def get_versions(*collections):
+    """Return the current version of each collection, in order."""
+    keys = [KEY_PREFIX + collection for collection in collections]
+    versions = cache.get_many(keys)
+    missing = {key: _seed() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def collection_etag(*collections, per_minute=False):
+    """Build an ``etag_func`` for ``django.views.decorators.http.condition``.
+
+    The tag covers the collection versions and the full request path, so
+    every filter and page gets its own tag. ``per_minute`` also folds in the
+    current minute, for payloads carrying elapsed times.
+    """
+    def etag(request, *args, **kwargs):
+        parts = [request.get_full_path(), *map(str, get_versions(*collections))]
+        if per_minute:
+            parts.append(timezone.now().strftime('%Y%m%d%H%M'))
+        return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+    return etag
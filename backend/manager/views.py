@@ -1,22 +1,121 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from django.db.models import Sum
-from django.db.models.functions import ExtractHour
+from rest_framework.exceptions import ValidationError
+import asyncio
+import copy
+import io
+import json
+from datetime import datetime, time, timedelta
+from django.db import IntegrityError, transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.db.models import F, Q
 from django.utils import timezone
-from .models import Table, Client, Partie, Parametres
-from .serializers import TableSerializer, ClientSerializer, PartieSerializer, ParametresSerializer
+from django.utils.dateparse import parse_date, parse_datetime
+from core.queries import QueryBudgetMixin
+from .models import Table, Client, Partie, PartieArchive, Parametres, RevenueRollup, FileAttente
+from . import events, versioning
+from .autocomplete import client_autocomplete
+from .export import astream_lines, stream_lines
+from .importer import CSVImportError, import_clients, import_parties
+from .pagination import PartieCursorPagination
+from .renderers import CSVRenderer, NDJSONRenderer
+from .reports import GRANULARITIES, MAX_PERIODS, compute_report, count_periods
+from .stats import get_dashboard_stats, start_of_today
+from .serializers import (
+    TableSerializer, ClientSerializer, PartieSerializer, PartieListSerializer, ParametresSerializer,
+    FileAttenteSerializer,
+)
 
+# Seconds between keep-alive comments on an idle live feed
+LIVE_FEED_KEEPALIVE = 15
+# Seconds before a live feed connection is closed; the browser reconnects
+LIVE_FEED_MAX_AGE = 5 * 60
 
-class ParametresViewSet(viewsets.ModelViewSet):
+
+def queue_payload(table_id, publish=False):
+    """Serialize a table's waiting queue with wait estimates."""
+    queue = FileAttenteSerializer(FileAttente.estimer(table_id), many=True).data
+    if publish:
+        events.publish_queue(table_id, queue)
+    return queue
+
+
+def parse_id_list(data, key):
+    """Return ``data[key]`` as a list of distinct integer ids, or raise a 400."""
+    values = data.get(key)
+    if not isinstance(values, list) or not values:
+        raise ValidationError({key: 'Une liste d\'identifiants est requise.'})
+    try:
+        return list(dict.fromkeys(int(value) for value in values))
+    except (TypeError, ValueError):
+        raise ValidationError({key: 'Identifiants invalides.'})
+
+
+def parse_date_bound(value, param, end=False):
+    """Parse a ``since``/``until`` query value into an aware datetime.
+
+    Accepts an ISO date or datetime. A bare date used as an upper bound
+    covers the whole day, so ``until=2026-01-31`` includes games of the 31st.
+    """
+    # Dates first: parse_datetime() also accepts a bare date on Python 3.11+
+    day = parse_date(value)
+    if day is not None:
+        if end:
+            day += timedelta(days=1)
+        dt = datetime.combine(day, time.min)
+    else:
+        dt = parse_datetime(value)
+        if dt is None:
+            raise ValidationError({param: 'Date invalide, format attendu AAAA-MM-JJ.'})
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+def csv_import_response(request, importer):
+    """Run ``importer`` on the uploaded ``file`` and return its report."""
+    upload = request.FILES.get('file')
+    if upload is None:
+        raise ValidationError({'file': 'Un fichier CSV est requis.'})
+    try:
+        report = importer(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''))
+    except (CSVImportError, UnicodeDecodeError) as exc:
+        raise ValidationError({'file': str(exc)})
+    return Response(report.as_dict(), status=status.HTTP_201_CREATED)
+
+
+def parse_report_date(value, param):
+    """Parse an optional ``AAAA-MM-JJ`` query value, or raise a 400."""
+    if not value:
+        return None
+    day = parse_date(value)
+    if day is None:
+        raise ValidationError({param: 'Date invalide, format attendu AAAA-MM-JJ.'})
+    return day
+
+
+class ParametresViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     """ViewSet for managing application parameters."""
     queryset = Parametres.objects.all()
     serializer_class = ParametresSerializer
     permission_classes = [permissions.AllowAny]
+    # Queries allowed per action (core.queries); see QUERY_BUDGETS. They are
+    # checked by manager.tests.QueryBudgetTests and count the BEGIN that
+    # SQLite runs for atomic blocks.
+    query_budgets = {'default': 4}
 
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(etag_func=versioning.collection_etag(versioning.PARAMETRES)))
     def list(self, request):
         """Get or create the default configuration."""
-        config, created = Parametres.objects.get_or_create(id=1)
+        config = Parametres.get_cached()
         serializer = self.get_serializer(config)
         return Response(serializer.data)
 
@@ -29,11 +128,17 @@ class ParametresViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class TableViewSet(viewsets.ModelViewSet):
+class TableViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     """ViewSet for managing billiard tables."""
     queryset = Table.objects.all()
     serializer_class = TableSerializer
     permission_classes = [permissions.AllowAny]
+    query_budgets = {
+        'default': 4,
+        'destroy': 12,  # cascades to the table's games, queue and rollups, settles balances
+        'queue': 6,
+        'dequeue': 7,  # pops the head, then re-estimates the remaining queue
+    }
 
     def get_queryset(self):
         queryset = Table.objects.all()
@@ -42,12 +147,51 @@ class TableViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(est_disponible=disponible.lower() == 'true')
         return queryset
 
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(etag_func=versioning.collection_etag(versioning.TABLES)))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        table = serializer.save()
+        events.publish_table(table)
 
-class ClientViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get', 'post'])
+    def queue(self, request, pk=None):
+        """List the table's waiting queue, or append a player to it."""
+        table = self.get_object()
+        if request.method == 'POST':
+            nom = str(request.data.get('nom') or '').strip()
+            if not nom:
+                raise ValidationError({'nom': 'Le nom du joueur est requis.'})
+            FileAttente.ajouter(table.id, nom[:100])
+            return Response(queue_payload(table.id, publish=True), status=status.HTTP_201_CREATED)
+        return Response(queue_payload(table.id))
+
+    @action(detail=True, methods=['post'])
+    def dequeue(self, request, pk=None):
+        """Remove and return the player at the head of the table's queue."""
+        table = self.get_object()
+        entry = FileAttente.retirer_premier(table.id)
+        if entry is None:
+            return Response(
+                {'error': 'La file d\'attente est vide'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queue_payload(table.id, publish=True)
+        return Response(FileAttenteSerializer(entry).data)
+
+
+class ClientViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     """ViewSet for managing clients."""
     queryset = Client.objects.all()
     serializer_class = ClientSerializer
     permission_classes = [permissions.AllowAny]
+    query_budgets = {
+        'default': 3,
+        'destroy': 8,  # unlinks the client's games and queue entries
+        'import_csv': None,  # a few queries per batch of rows
+    }
 
     def get_queryset(self):
         queryset = Client.objects.all()
@@ -56,12 +200,51 @@ class ClientViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(nom__icontains=search)
         return queryset
 
+    @action(detail=False, methods=['get'])
+    def top_debtors(self, request):
+        """List the clients owing the most, from their precomputed balances."""
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            raise ValidationError({'limit': 'Nombre entier attendu.'})
+        debtors = Client.objects.filter(solde_du__gt=0).order_by('-solde_du')[:limit]
+        return Response(self.get_serializer(debtors, many=True).data)
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser],
+            permission_classes=[permissions.IsAdminUser])
+    def import_csv(self, request):
+        """Import clients from an uploaded CSV (``nom``, ``telephone``, ``email``)."""
+        return csv_import_response(request, import_clients)
+
 
-class PartieViewSet(viewsets.ModelViewSet):
+class PartieViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     """ViewSet for managing game sessions."""
-    queryset = Partie.objects.all().order_by('-date_debut')
+    queryset = Partie.objects.select_related('table', 'client').order_by('-date_debut')
     serializer_class = PartieSerializer
     permission_classes = [permissions.AllowAny]
+    query_budgets = {
+        'default': 4,
+        'create': 10,
+        # Moving a game between clients validates the new one and updates
+        # the rollup bucket twice
+        'update': 8,
+        'partial_update': 8,
+        'destroy': 6,
+        # 28 at worst: cold caches, a new loser, a new rollup bucket and the
+        # next game started from the queue
+        'stop': 30,
+        'set_next_player': 7,
+        'pay': 7,
+        # Rollups and balances are written in batch, whatever the number of games
+        'bulk_pay': 9,
+        'bulk_stop': 12,
+        'import_csv': None,
+    }
+    pagination_class = PartieCursorPagination
+
+    # Query parameters that narrow the list explicitly; without any of them
+    # the list falls back to the compact "active + today" view.
+    LIST_FILTER_PARAMS = ('nom', 'paye', 'en_cours', 'since', 'until', 'scope')
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -75,45 +258,129 @@ class PartieViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(est_paye=(paye.lower() == 'true'))
         if en_cours is not None:
             queryset = queryset.filter(est_en_cours=en_cours.lower() == 'true')
-        
+
+        if self.action == 'list':
+            queryset = self.filter_date_window(queryset)
+            queryset = queryset.annotate(
+                table_nom=F('table__nom'),
+                client_nom=F('client__nom'),
+            ).values(*PartieListSerializer.LIST_FIELDS)
+
+        return queryset
+
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(etag_func=versioning.collection_etag(
+        versioning.PARTIES, versioning.CLIENTS, versioning.TABLES, per_minute=True,
+    )))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return PartieListSerializer
+        return super().get_serializer_class()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.action == 'export' and isinstance(response, Response):
+            # The export renderers only declare the streamed formats: its
+            # errors (bad dates, unknown format) are JSON like everywhere else
+            response.accepted_renderer = JSONRenderer()
+            response.accepted_media_type = JSONRenderer.media_type
+        return response
+
+    def get_archive_queryset(self):
+        """Archived games matching the ``nom``/``paye``/``en_cours`` filters.
+
+        They are all finished and paid, so asking for unpaid or active games
+        excludes them entirely.
+        """
+        params = self.request.query_params
+        nom = params.get('nom')
+        paye = params.get('paye')
+        en_cours = params.get('en_cours')
+
+        if (paye and paye.lower() != 'true') or (en_cours is not None and en_cours.lower() == 'true'):
+            return PartieArchive.objects.none()
+        queryset = PartieArchive.objects.all()
+        if nom:
+            queryset = queryset.filter(client__nom__icontains=nom)
+        return queryset
+
+    def filter_date_bounds(self, queryset):
+        """Keep games started within the ``since``/``until`` query bounds."""
+        params = self.request.query_params
+        since = params.get('since')
+        until = params.get('until')
+
+        if since:
+            queryset = queryset.filter(date_debut__gte=parse_date_bound(since, 'since'))
+        if until:
+            queryset = queryset.filter(date_debut__lt=parse_date_bound(until, 'until', end=True))
+        return queryset
+
+    def filter_date_window(self, queryset):
+        """Restrict the list to the ``since``/``until`` window.
+
+        With no filter at all, only active games and games started today are
+        returned. ``scope=all`` lifts that default to page through the live
+        table; archived games are only read by the export and the rollups.
+        """
+        params = self.request.query_params
+        queryset = self.filter_date_bounds(queryset)
+
+        if not any(param in params for param in self.LIST_FILTER_PARAMS):
+            queryset = queryset.filter(Q(est_en_cours=True) | Q(date_debut__gte=start_of_today()))
+
         return queryset
 
     def create(self, request, *args, **kwargs):
         """Create a new game session and start it."""
         table_id = request.data.get('table')
-        
-        # Check if table is available
-        try:
-            table = Table.objects.get(id=table_id)
-            if not table.est_disponible:
+        next_player = str(request.data.get('next_player') or '').strip()[:100] or None
+
+        partie = Partie.demarrer(table_id, next_player=next_player) if str(table_id).isdigit() else None
+        if partie is None:
+            if str(table_id).isdigit() and Table.objects.filter(id=table_id).exists():
                 return Response(
                     {'error': 'La table n\'est pas disponible'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-        except Table.DoesNotExist:
             return Response(
                 {'error': 'Table non trouvée'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Create the partie
-        partie = Partie.objects.create(
-            table=table,
-            client=None,
-            date_debut=timezone.now(),
-            est_en_cours=True,
-            prix=0
-        )
-        
-        # Mark table as unavailable
-        table.est_disponible = False
-        table.save()
-        
+
+        if next_player:
+            FileAttente.ajouter(partie.table_id, next_player)
+            queue_payload(partie.table_id, publish=True)
+        events.publish_partie(events.PARTIE_STARTED, partie)
+        events.publish_table(partie.table)
         return Response(PartieSerializer(partie).data, status=status.HTTP_201_CREATED)
 
+    def perform_update(self, serializer):
+        """Save edits and move the game's contribution between rollup buckets and client balances."""
+        before = copy.copy(serializer.instance)
+        with transaction.atomic():
+            partie = serializer.save()
+            RevenueRollup.apply(before, sign=-1)
+            RevenueRollup.apply(partie)
+            Client.ajuster_soldes([before.dette(sign=-1), partie.dette()])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            RevenueRollup.apply(instance, sign=-1)
+            Client.ajuster_soldes([instance.dette(sign=-1)])
+            instance.delete()
+
     @action(detail=True, methods=['post'])
     def stop(self, request, pk=None):
-        """Stop a game session and calculate total price."""
+        """Stop a game session and calculate total price.
+
+        Unless ``auto_start`` is false, the next game on the table starts at
+        once for the player at the head of its waiting queue; it is returned
+        under ``next_partie``.
+        """
         partie = self.get_object()
         if not partie.est_en_cours:
             return Response(
@@ -123,54 +390,203 @@ class PartieViewSet(viewsets.ModelViewSet):
         
         # Get loser_name from request, create client if needed
         loser_name = request.data.get('loser_name', '')
-        partie.stop_partie(loser_name)
-        return Response(PartieSerializer(partie).data)
+        auto_start = str(request.data.get('auto_start', 'true')).lower() != 'false'
+        for attempt in range(2):
+            next_partie = None
+            try:
+                with transaction.atomic():
+                    if not partie.stop_partie(loser_name):
+                        return Response(
+                            {'error': 'La partie nest pas en cours'},
+                            status=status.HTTP_400_BAD_REQUEST
+                        )
+                    next_partie = self.start_next_in_queue(partie.table_id) if auto_start else None
+                break
+            except IntegrityError:
+                # Foreign keys are checked at commit: a cached name resolution
+                # pointed to a client deleted since. Forget it and stop again.
+                if attempt:
+                    raise
+                Client.oublier(partie.client)
+                partie = self.get_object()
+
+        events.publish_partie(events.PARTIE_STOPPED, partie)
+        data = PartieSerializer(partie).data
+        if next_partie is None:
+            events.publish_table(partie.table)
+        else:
+            events.publish_partie(events.PARTIE_STARTED, next_partie)
+            data['next_partie'] = PartieSerializer(next_partie).data
+        return Response(data)
+
+    def start_next_in_queue(self, table_id):
+        """Start a game for the head of the table's queue, if anyone is waiting."""
+        entry = FileAttente.retirer_premier(table_id)
+        if entry is None:
+            return None
+        # The queued player is only named: the game's client is whoever
+        # loses it, set when it is stopped
+        next_partie = Partie.demarrer(table_id, next_player=entry.nom)
+        queue_payload(table_id, publish=True)
+        return next_partie
+
+    @action(detail=True, methods=['post'])
+    def set_next_player(self, request, pk=None):
+        """Add a player to the waiting queue of this game's table."""
+        partie = self.get_object()
+        nom = str(request.data.get('next_player') or '').strip()[:100]
+        if not nom:
+            raise ValidationError({'next_player': 'Le nom du joueur est requis.'})
+
+        FileAttente.ajouter(partie.table_id, nom)
+        if partie.est_en_cours and not partie.next_player:
+            partie.next_player = nom
+            partie.save(update_fields=['next_player', 'updated_at'])
+        return Response(queue_payload(partie.table_id, publish=True), status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['post'])
     def pay(self, request, pk=None):
         """Mark a game session as paid."""
         partie = self.get_object()
-        partie.est_paye = True
-        partie.save()
+        if partie.payer():
+            events.publish_partie(events.PARTIE_PAID, partie)
         return Response(PartieSerializer(partie).data)
 
+    @action(detail=False, methods=['post'])
+    def bulk_pay(self, request):
+        """Mark several game sessions as paid in one transaction."""
+        ids = parse_id_list(request.data, 'ids')
+        results, paid = Partie.payer_plusieurs(ids)
+        for partie in paid:
+            events.publish_partie(events.PARTIE_PAID, partie)
+        return Response({'results': [{'id': pk, 'status': result} for pk, result in results.items()]})
+
+    @action(detail=False, methods=['post'])
+    def bulk_stop(self, request):
+        """Stop every active game on the given tables in one transaction."""
+        table_ids = parse_id_list(request.data, 'tables')
+        parties = Partie.arreter_tables(table_ids)
+        for partie in parties:
+            events.publish_partie(events.PARTIE_STOPPED, partie)
+            events.publish_table(partie.table)
+
+        stopped = {partie.table_id: partie for partie in parties}
+        return Response({'results': [
+            {'table': table_id, 'status': 'stopped', 'partie': PartieSerializer(stopped[table_id]).data}
+            if table_id in stopped else {'table': table_id, 'status': 'no_active_game'}
+            for table_id in table_ids
+        ]})
+
+    @action(detail=False, methods=['post'])
+    def bulk_next_player(self, request):
+        """Set the next player of several game sessions at once.
+
+        Expects ``{"next_players": {"<partie id>": "<name>", ...}}``.
+        """
+        next_players = request.data.get('next_players')
+        if not isinstance(next_players, dict) or not next_players:
+            raise ValidationError({'next_players': 'Un objet {id: nom} est requis.'})
+        try:
+            next_players = {int(pk): str(name or '')[:100] for pk, name in next_players.items()}
+        except (TypeError, ValueError):
+            raise ValidationError({'next_players': 'Identifiants invalides.'})
+
+        updated = set(Partie.definir_prochains_joueurs(next_players))
+        return Response({'results': [
+            {'id': pk, 'status': 'updated' if pk in updated else 'not_found'} for pk in next_players
+        ]})
+
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """Stream game sessions as CSV or NDJSON, oldest first.
+
+        ``?format=csv|ndjson`` (CSV by default) with optional ``since`` and
+        ``until`` bounds; the ``nom``/``paye``/``en_cours`` filters apply too.
+        Archived games are included.
+        """
+        fmt = request.accepted_renderer.format
+        since = request.query_params.get('since')
+        until = request.query_params.get('until')
+        queryset = self.filter_date_bounds(self.get_queryset())
+        archives = self.filter_date_bounds(self.get_archive_queryset())
+
+        if isinstance(request._request, ASGIRequest):
+            lines = astream_lines(fmt, queryset, archives)
+        else:
+            lines = stream_lines(fmt, queryset, archives)
+        response = StreamingHttpResponse(lines, content_type=request.accepted_renderer.media_type)
+        filename = '-'.join(['parties', *filter(None, [since, until])])
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser],
+            permission_classes=[permissions.IsAdminUser])
+    def import_csv(self, request):
+        """Import finished game sessions from an uploaded CSV, in the export format."""
+        return csv_import_response(request, import_parties)
+
     @action(detail=False, methods=['get'])
     def search_client(self, request):
         """Search clients by name for autocomplete."""
         q = request.query_params.get('q', '')
-        clients = Client.objects.filter(nom__icontains=q)[:10]
-        serializer = ClientSerializer(clients, many=True)
-        return Response(serializer.data)
+        return Response(client_autocomplete.search(q, limit=10))
 
     @action(detail=False, methods=['get'])
     def get_stats(self, request):
         """Get dashboard statistics."""
-        total_argent = Partie.objects.aggregate(Sum('prix'))['prix__sum'] or 0
-        total_parties = Partie.objects.count()
-        
-        # Calculate peak hour (most profitable)
-        pic = Partie.objects.annotate(heure=ExtractHour('date_debut'))\
-            .values('heure').annotate(total=Sum('prix')).order_by('-total').first()
-        
-        # Today's stats
-        today = timezone.now().date()
-        today_parties = Partie.objects.filter(date_debut__date=today)
-        today_revenue = sum(partie.prix for partie in today_parties)
-        
-        # Active parties
-        active_parties = Partie.objects.filter(est_en_cours=True)
-        
-        # Available tables
-        available_tables = Table.objects.filter(est_disponible=True).count()
-        total_tables = Table.objects.count()
-        
-        return Response({
-            "total_money": float(total_argent) if total_argent else 0,
-            "total_games": total_parties,
-            "peak_hour": pic['heure'] if pic else 0,
-            "unpaid_count": Partie.objects.filter(est_paye=False).count(),
-            "today_revenue": float(today_revenue),
-            "today_games": today_parties.count(),
-            "active_parties_count": active_parties.count(),
-            "available_tables": f"{available_tables}/{total_tables}",
-        })
+        return Response(get_dashboard_stats())
+
+    @action(detail=False, methods=['get'])
+    def report(self, request):
+        """Revenue, games, average duration and occupancy per day, week or month.
+
+        ``since``/``until`` are inclusive dates (the last 30 days by default);
+        ``par_table=true`` adds a per-table breakdown.
+        """
+        params = request.query_params
+        until = parse_report_date(params.get('until'), 'until') or timezone.localdate()
+        since = parse_report_date(params.get('since'), 'since') or until - timedelta(days=29)
+        granularity = params.get('granularity', 'day')
+        if granularity not in GRANULARITIES:
+            raise ValidationError({'granularity': f"Valeurs possibles: {', '.join(GRANULARITIES)}."})
+        if since > until:
+            raise ValidationError({'since': 'La date de début doit précéder la date de fin.'})
+        if count_periods(since, until, granularity) > MAX_PERIODS:
+            raise ValidationError({
+                'granularity': f'Plus de {MAX_PERIODS} périodes, choisissez une granularité plus large.',
+            })
+        by_table = params.get('par_table', 'false').lower() == 'true'
+        return Response(compute_report(since, until, granularity, by_table))
+
+
+async def live_feed(request):
+    """Stream game and table state changes as Server-Sent Events.
+
+    Requires an ASGI server: the connection stays open and receives one
+    ``event:``/``data:`` frame per change, plus a keep-alive comment.
+    Django 4.2 is not told when a client goes away mid-stream, so each
+    connection is closed after ``LIVE_FEED_MAX_AGE`` seconds, which bounds
+    how long a gone client keeps its subscription; ``EventSource``
+    reconnects on its own.
+    """
+    async def stream():
+        queue = events.broker.subscribe()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + LIVE_FEED_MAX_AGE
+        try:
+            yield 'retry: 3000\n\n'
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=min(LIVE_FEED_KEEPALIVE, remaining))
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                event_type = json.loads(payload)['type']
+                yield f'event: {event_type}\ndata: {payload}\n\n'
+        finally:
+            events.broker.unsubscribe(queue)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
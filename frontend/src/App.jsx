@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Play, Square, LayoutDashboard, History, Settings, LogOut, Users, Plus, X } from 'lucide-react';
 import Swal from 'sweetalert2';
-import { gameAPI, configAPI } from './services/api';
+import { gameAPI, configAPI, liveAPI } from './services/api';
 
 // Couleurs par table
 const tableStyles = {
@@ -32,9 +32,10 @@ function App() {
   const refreshData = async () => {
     try {
       const t = await gameAPI.getTables();
-      const g = await gameAPI.getGames();
+      // Active games and today's games, every page; history pages on its own
+      const g = await gameAPI.getAllGames();
       setTables(t.data);
-      setGames(g.data);
+      setGames(g);
     } catch (error) {
       console.error("Erreur refreshData", error);
     }
@@ -45,6 +46,17 @@ function App() {
     load();
   }, []);
 
+  // Apply pushed changes instead of re-polling the full lists
+  useEffect(() => {
+    const upsert = (list, item) => (
+      list.some(x => x.id === item.id) ? list.map(x => (x.id === item.id ? item : x)) : [item, ...list]
+    );
+    return liveAPI.subscribe(({ type, data }) => {
+      if (type === 'table.updated') setTables(prev => upsert(prev, data));
+      else if (type.startsWith('partie.')) setGames(prev => upsert(prev, data));
+    });
+  }, []);
+
   const handleLogout = () => {
     localStorage.clear();
     window.location.href = "/";
@@ -129,7 +141,7 @@ function App() {
         {activePage === 'dashboard' ? (
           <DashboardView tables={tables} games={games} refresh={refreshData} />
         ) : activePage === 'history' ? (
-          <HistoryView games={games} />
+          <HistoryView />
         ) : (
           <SettingsView tables={tables} refresh={refreshData} />
         )}
@@ -384,12 +396,41 @@ function DashboardView({ tables, games, refresh }) {
 }
 
 // --- HISTORY VIEW ---
-function HistoryView({ games }) {
+function HistoryView() {
   const [filter, setFilter] = useState("");
+  const [games, setGames] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Filtered by the server over the whole history, newest first
+  useEffect(() => {
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const res = await gameAPI.getGames(filter ? { scope: 'all', nom: filter } : { scope: 'all' });
+        if (!cancelled) {
+          setGames(res.data.results);
+          setNextPage(res.data.next);
+        }
+      } catch (error) {
+        console.error("Erreur historique", error);
+      }
+    }, 300);
+    return () => { cancelled = true; clearTimeout(timer); };
+  }, [filter]);
 
-  const filteredData = games.filter(g => 
-    (g.client_nom || '').toLowerCase().includes(filter.toLowerCase())
-  ).sort((a, b) => new Date(b.date_debut) - new Date(a.date_debut));
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const res = await gameAPI.getGamesPage(nextPage);
+      setGames(prev => [...prev, ...res.data.results]);
+      setNextPage(res.data.next);
+    } catch (error) {
+      console.error("Erreur historique", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   return (
     <div className="max-w-6xl mx-auto">
@@ -421,7 +462,7 @@ function HistoryView({ games }) {
             </tr>
           </thead>
           <tbody>
-            {filteredData.length > 0 ? filteredData.map(game => (
+            {games.length > 0 ? games.map(game => (
               <tr key={game.id} className="border-t border-slate-800 hover:bg-slate-800/50">
                 <td className="p-3 text-slate-400 text-sm">
                   {new Date(game.date_debut).toLocaleDateString('fr-FR', { day: '2-digit', month: 'short', hour: '2-digit', minute: '2-digit' })}
@@ -442,6 +483,18 @@ function HistoryView({ games }) {
             )}
           </tbody>
         </table>
+
+        {nextPage && (
+          <div className="flex justify-center mt-6">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="px-6 py-3 bg-slate-800 border border-slate-700 rounded-2xl text-sm font-bold hover:border-indigo-500 transition disabled:opacity-50"
+            >
+              {loadingMore ? 'Chargement...' : 'Charger plus'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
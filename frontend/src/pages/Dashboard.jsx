@@ -43,7 +43,7 @@ function Dashboard() {
       if (filterUnpaid) params.append('paye', 'false');
       
       const gamesRes = await api.get(`${API_URL}/parties/?${params}`);
-      setGames(gamesRes.data);
+      setGames(gamesRes.data.results);
       
       const statsRes = await api.get(`${API_URL}/parties/get_stats/`);
       setStats(statsRes.data);
@@ -73,7 +73,19 @@ export const configAPI = {
 // Game/Manager API methods
 export const gameAPI = {
   getTables: () => api.get('/manager/tables/'),
-  getGames: () => api.get('/manager/parties/'),
+  getGames: (params = {}) => api.get('/manager/parties/', { params }),
+  // Next page of a cursor-paginated list, from the `next` URL of the previous one
+  getGamesPage: (url) => api.get(url),
+  // Every page of a (bounded) list, following the cursor to the end
+  getAllGames: async (params = {}) => {
+    let res = await api.get('/manager/parties/', { params });
+    const games = [...res.data.results];
+    while (res.data.next) {
+      res = await api.get(res.data.next);
+      games.push(...res.data.results);
+    }
+    return games;
+  },
   getStats: () => api.get('/manager/parties/get_stats/'),
   getClients: () => api.get('/manager/clients/'),
   searchClients: (q) => api.get(`/manager/parties/search_client/?q=${q}`),
@@ -92,4 +104,15 @@ export const gameAPI = {
   deleteTable: (id) => api.delete(`manager/tables/${id}/`),
 };
 
+// Live feed of game/table changes (Server-Sent Events)
+export const liveAPI = {
+  subscribe: (onEvent) => {
+    const source = new EventSource(`${API_URL}/manager/live/`);
+    ['partie.started', 'partie.stopped', 'partie.paid', 'table.updated', 'table.queue'].forEach((type) => {
+      source.addEventListener(type, (e) => onEvent(JSON.parse(e.data)));
+    });
+    return () => source.close();
+  },
+};
+
 export default api;